@@ -0,0 +1,74 @@
+# benchmarks/bench_aggregate.py
+"""
+Micro-benchmark: aggregating scored reviews with Python sums over lists and
+pandas Series vs the vectorized NumPy aggregation in SentimentAnalyzer.
+
+Run from the repository root:
+    python -m benchmarks.bench_aggregate [rows]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from sentiment_analysis.workflow.sentiment_analyzer import compare_scores
+
+def make_scores(n: int, seed: int = 0):
+    """Random review scores and VADER-like score arrays"""
+    rng = np.random.default_rng(seed)
+    scores = np.round(rng.integers(0, 10, n) / 9, 2)
+    neg, neu = rng.random(n) * 0.5, rng.random(n) * 0.5
+    sentiments = {'neg': neg, 'neu': neu, 'pos': 1 - neg - neu, 'compound': rng.uniform(-1, 1, n)}
+    return scores, sentiments
+
+def legacy_aggregate(scores: np.ndarray, sentiments: dict) -> dict:
+    """The list-based aggregation analyze_reviews used before"""
+    rows = [dict(zip(sentiments, values)) for values in zip(*sentiments.values())]
+    total = len(rows)
+    scores = scores.tolist()
+    normalized = [(row['compound'] + 1) / 2 for row in rows]
+    positive = sum(1 for row in rows if row['compound'] >= 0.05)
+    negative = sum(1 for row in rows if row['compound'] <= -0.05)
+    return {
+        'average_scores': {key: round(sum(row[key] for row in rows) / total, 3) for key in sentiments},
+        'sentiment_distribution': {'positive': positive, 'negative': negative,
+                                   'neutral': total - positive - negative},
+        'correlation': round(pd.Series(scores).corr(pd.Series(normalized)), 3),
+        'mae': round(sum(abs(s - c) for s, c in zip(scores, normalized)) / total, 3),
+        'rmse': round((sum((s - c) ** 2 for s, c in zip(scores, normalized)) / total) ** 0.5, 3)
+    }
+
+def vectorized_aggregate(scores: np.ndarray, sentiments: dict) -> dict:
+    """The same metrics computed the way SentimentAnalyzer does now"""
+    total = len(scores)
+    compounds = sentiments['compound']
+    positive = int((compounds >= 0.05).sum())
+    negative = int((compounds <= -0.05).sum())
+    return {
+        'average_scores': {key: round(float(values.sum()) / total, 3) for key, values in sentiments.items()},
+        'sentiment_distribution': {'positive': positive, 'negative': negative,
+                                   'neutral': total - positive - negative},
+        **compare_scores(scores, (compounds + 1) / 2)
+    }
+
+def timed(func, *args, repeat: int = 3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    scores, sentiments = make_scores(rows)
+    old_time, old = timed(legacy_aggregate, scores, sentiments)
+    new_time, new = timed(vectorized_aggregate, scores, sentiments)
+    print(f"{rows} rows")
+    print(f"  legacy     {old_time * 1000:9.1f} ms")
+    print(f"  vectorized {new_time * 1000:9.1f} ms   speedup {old_time / new_time:6.1f}x")
+    print(f"  identical results: {old == new}")
+
+if __name__ == '__main__':
+    main()
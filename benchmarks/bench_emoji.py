@@ -0,0 +1,68 @@
+# benchmarks/bench_emoji.py
+"""
+Micro-benchmark: per-character emoji lookups vs the precompiled EmojiIndex.
+
+Run from the repository root:
+    python -m benchmarks.bench_emoji
+"""
+import random
+import time
+
+import emoji
+
+from sentiment_analysis.workflow.cleaning import TextCleaner
+
+WORDS = ['the', 'movie', 'was', 'so', 'good', 'ariana', 'cynthia', 'and', 'i', 'cried',
+         'a', 'masterpiece', 'this', 'is', 'not', 'it', 'slay', 'defying', 'gravity']
+EMOJIS = ['😭', '😍', '🔥', '💚', '🩷', '👍🏽', '🏳️‍🌈', '❤️', '✨', '🧹', '💅🏻', '👩‍❤️‍👩']
+
+def make_reviews(n: int, emoji_ratio: float, seed: int = 0) -> list[str]:
+    """Build Letterboxd-style reviews where roughly emoji_ratio of the tokens are emojis"""
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choice(EMOJIS) if rng.random() < emoji_ratio else rng.choice(WORDS)
+                 for _ in range(rng.randint(5, 60)))
+        for _ in range(n)
+    ]
+
+def legacy_extract_emojis(text):
+    emoji_list = []
+    for char in text:
+        if char in emoji.EMOJI_DATA:
+            emoji_list.append(emoji.EMOJI_DATA[char]['en'].replace(':', '').replace('_', ' '))
+    return ' '.join(emoji_list) if emoji_list else ''
+
+def legacy_remove_stopwords(text, stop):
+    return ' '.join(word for word in text.split()
+                    if word not in stop or any(char in emoji.EMOJI_DATA for char in word))
+
+def timed(func, reviews, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for review in reviews:
+            func(review)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    cleaner = TextCleaner()
+    stop = cleaner.stopwords
+    # The per-word check also runs on cleaned text, where emoji characters are already gone
+    cases = {
+        'emoji-heavy raw text': make_reviews(20000, 0.3),
+        'typical raw text': make_reviews(20000, 0.03),
+        'cleaned text': [cleaner.emojis.split(r)[0] for r in make_reviews(20000, 0.3)],
+    }
+    for name, reviews in cases.items():
+        print(f"\n{name} ({len(reviews)} reviews)")
+        for label, old, new in [
+            ('extract_emojis', legacy_extract_emojis, cleaner.extract_emojis),
+            ('remove_stopwords', lambda t: legacy_remove_stopwords(t, stop), cleaner.remove_stopwords),
+        ]:
+            old_time, new_time = timed(old, reviews), timed(new, reviews)
+            print(f"  {label:<18} legacy {old_time * 1000:8.1f} ms   index {new_time * 1000:8.1f} ms   "
+                  f"speedup {old_time / new_time:5.2f}x")
+
+if __name__ == '__main__':
+    main()
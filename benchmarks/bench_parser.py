@@ -0,0 +1,89 @@
+# benchmarks/bench_parser.py
+"""
+Micro-benchmark: review page parsing with BeautifulSoup vs lxml, and how long
+the event loop stalls when pages are parsed on it instead of on a thread.
+
+Run from the repository root, optionally on a directory of saved pages or
+on the scraper's page cache (senti scrape --http-cache):
+    python -m benchmarks.bench_parser [pages_dir | out/cache/pages.sqlite]
+"""
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.fixtures import make_review_page
+from sentiment_analysis.sources.letterboxd.page_cache import PageCache
+from sentiment_analysis.sources.letterboxd.scraper import parse_reviews_bs4, parse_reviews_lxml
+
+def load_pages(source: str = None, count: int = 200) -> list[str]:
+    if source and source.endswith('.sqlite'):
+        with PageCache(source) as cache:
+            return [cache.get(url).html for url in cache.urls()]
+    if source:
+        return [path.read_text(encoding='utf-8') for path in sorted(Path(source).glob('*.html'))]
+    return [make_review_page('fixture-movie', page, count) for page in range(1, count + 1)]
+
+def timed(parse, pages, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            parse(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+async def max_loop_stall(parse, pages, executor=None) -> float:
+    """Longest gap between ticks of a 1ms heartbeat while all pages are parsed"""
+    loop = asyncio.get_running_loop()
+    stall = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    async def parse_all():
+        for html in pages:
+            if executor is None:
+                parse(html)
+                await asyncio.sleep(0)
+            else:
+                await loop.run_in_executor(executor, parse, html)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+    await parse_all()
+    done = True
+    await beat
+    return stall
+
+def main():
+    pages = load_pages(sys.argv[1] if len(sys.argv) > 1 else None)
+    size = sum(len(html) for html in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {size:.0f} KiB on average")
+
+    for html in pages:
+        assert parse_reviews_bs4(html) == parse_reviews_lxml(html), "parsers disagree"
+
+    results = {}
+    for label, parse in [('bs4 html.parser', parse_reviews_bs4), ('lxml', parse_reviews_lxml)]:
+        elapsed = timed(parse, pages)
+        results[label] = elapsed
+        print(f"  {label:<16} {len(pages) / elapsed:8.1f} pages/s")
+    print(f"  speedup          {results['bs4 html.parser'] / results['lxml']:8.1f}x")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        inline = asyncio.run(max_loop_stall(parse_reviews_lxml, pages))
+        threaded = asyncio.run(max_loop_stall(parse_reviews_lxml, pages, executor))
+    print(f"\nlongest event loop stall: {inline * 1000:.1f} ms on the loop, "
+          f"{threaded * 1000:.1f} ms on a thread")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_plot.py
+"""
+Micro-benchmark: rendering the plot_all overview with seaborn over every
+review vs the binned mode (grid KDE and 2D histogram), as the review count
+grows.
+
+Run from the repository root:
+    python -m benchmarks.bench_plot [max_rows]
+"""
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+from sentiment_analysis.workflow.plotter import SentimentPlotter
+
+def make_results(n: int, seed: int = 0) -> dict:
+    """Results dict shaped like SentimentAnalyzer.analyze_reviews output"""
+    rng = np.random.default_rng(seed)
+    scores = np.round(rng.integers(0, 10, n) / 9, 2)
+    sentiments = np.clip(scores * 0.4 + rng.normal(0.3, 0.2, n), 0, 1)
+    return {
+        'total_reviews': n,
+        'average_scores': {'positive': 0.3, 'negative': 0.2, 'neutral': 0.5, 'compound': 0.2},
+        'sentiment_distribution': {'positive': n // 2, 'negative': n // 3, 'neutral': n - n // 2 - n // 3},
+        'sentiment_percentages': {'positive': 50.0, 'negative': 33.3, 'neutral': 16.7},
+        'comparison': {
+            'review_scores': scores.tolist(),
+            'sentiment_scores': sentiments.tolist(),
+            'correlation': round(float(np.corrcoef(scores, sentiments)[0, 1]), 3),
+            'mae': 0.0,
+            'rmse': 0.0
+        }
+    }
+
+def render(results: dict, mode: str, out_dir: str, sample_size: int = None) -> float:
+    plotter = SentimentPlotter(out_dir, mode, sample_size)
+    start = time.perf_counter()
+    plotter.plot_all(results, 'bench', 'vader', show=False)
+    return time.perf_counter() - start
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sizes = [n for n in (10_000, 50_000, 200_000, 1_000_000) if n <= max_rows]
+    with tempfile.TemporaryDirectory() as out_dir:
+        print(f"{'reviews':>9} {'exact':>10} {'binned':>10} {'binned+sample':>14}")
+        for n in sizes:
+            results = make_results(n)
+            # seaborn's regplot bootstraps its CI over every point; skip it where it takes minutes
+            exact = f"{render(results, 'exact', out_dir):9.2f}s" if n <= 50_000 else f"{'-':>10}"
+            binned = render(results, 'binned', out_dir)
+            sampled = render(results, 'binned', out_dir, sample_size=5000)
+            print(f"{n:>9} {exact} {binned:9.2f}s {sampled:13.2f}s")
+
+if __name__ == '__main__':
+    main()
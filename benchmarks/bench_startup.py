@@ -0,0 +1,70 @@
+# benchmarks/bench_startup.py
+"""
+Startup benchmark for the senti CLI: wall time of light subcommands, the
+slowest imports reported by `python -X importtime`, and a check that heavy
+libraries stay unloaded. Exits non-zero when a command exceeds its budget.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup [--budget 0.5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = {
+    '--version': ['--version'],
+    'analyze --text': ['analyze', '--text', 'Great movie!'],
+}
+# None of these are needed to score a single text with VADER
+HEAVY_MODULES = ['pandas', 'matplotlib', 'seaborn', 'sklearn', 'joblib', 'nltk',
+                 'langdetect', 'emoji', 'aiohttp', 'bs4', 'lxml']
+
+def run(args: list[str], importtime: bool = False) -> tuple[float, str]:
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-m', 'sentiment_analysis.app.main', *args]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, env={**os.environ, 'PYTHONWARNINGS': 'ignore'})
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{proc.stdout}{proc.stderr}")
+    return elapsed, proc.stderr
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per top-level package"""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        # The first import of a package includes its submodules, so keep the largest entry
+        totals[package] = max(totals.get(package, 0), int(cumulative))
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget', type=float, default=0.5, help="Maximum median wall time in seconds")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for label, cmd in COMMANDS.items():
+        run(cmd)  # warm the bytecode and file system caches
+        median = statistics.median(run(cmd)[0] for _ in range(args.repeat))
+        _, stderr = run(cmd, importtime=True)
+        totals = parse_importtime(stderr)
+        heavy = [m for m in HEAVY_MODULES if m in totals]
+
+        status = 'ok' if median <= args.budget and not heavy else 'OVER BUDGET'
+        failed |= status != 'ok'
+        print(f"\nsenti {label}: {median * 1000:.0f} ms median (budget {args.budget * 1000:.0f} ms) {status}")
+        for package, micros in sorted(totals.items(), key=lambda item: -item[1])[:8]:
+            print(f"  {package:<24} {micros / 1000:8.1f} ms")
+        if heavy:
+            print(f"  heavy modules imported: {', '.join(heavy)}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/fixtures.py
+"""
+Synthetic Letterboxd review pages with the markup the scraper relies on
+(li.film-detail, a.avatar, span.rating, div.body-text, span._nobr and the
+paginate-pages links), padded with page chrome so parse times are realistic.
+"""
+import os
+import random
+from datetime import date, timedelta
+from html import escape
+
+WORDS = ['the', 'movie', 'was', 'so', 'good', 'ariana', 'cynthia', 'and', 'i', 'cried',
+         'a', 'masterpiece', 'this', 'is', 'not', 'it', 'slay', 'defying', 'gravity',
+         'musical', 'songs', 'costumes', 'too', 'long', 'but', 'worth', 'every', 'minute']
+EMOJIS = ['😭', '😍', '🔥', '💚', '🩷', '👍🏽', '🏳️‍🌈', '❤️', '✨']
+FOREIGN = ['la película fue increíble', 'der film war großartig', '映画は素晴らしかった']
+
+def make_review_text(rng: random.Random) -> str:
+    """One review text with a realistic mix of length, emojis and languages"""
+    if rng.random() < 0.05:
+        return rng.choice(FOREIGN)
+    words = [rng.choice(EMOJIS) if rng.random() < 0.03 else rng.choice(WORDS)
+             for _ in range(rng.randint(3, 80))]
+    return ' '.join(words)
+
+def _stars(rating: float) -> str:
+    return '★' * int(rating) + ('½' if rating % 1 else '')
+
+def make_review_page(movie: str, page: int, last_page: int, reviews_per_page: int = 12,
+                     seed: int = 0, newest: date = date(2024, 12, 31)) -> str:
+    """HTML of one review page; pages past last_page have no reviews"""
+    rng = random.Random(f'{movie}-{page}-{seed}')
+    count = 0 if page > last_page else reviews_per_page
+    items = []
+    for i in range(count):
+        index = (page - 1) * reviews_per_page + i
+        rating = rng.choice([0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4, 4.5, 5])
+        day = newest - timedelta(days=index // 40)
+        text = escape(make_review_text(rng))
+        items.append(f'''
+        <li class="film-detail -viewing">
+          <a class="avatar -a40" href="/member{index}/"><img src="/avatar/{index}.jpg" alt="member{index}" width="40" height="40"></a>
+          <div class="film-detail-content">
+            <div class="attribution-block -large">
+              <p class="attribution"><strong class="name">member{index}</strong>
+                <span class="rating -green rated-{int(rating * 2)}"> {_stars(rating)} </span>
+                <span class="date"><a href="/member{index}/film/{movie}/"><span class="_nobr">{day.strftime('%d %b %Y')}</span></a></span>
+              </p>
+            </div>
+            <div class="body-text -prose collapsible-text" data-full-text-url="/s/full-text/viewing:{index}/">
+              <p>{text}</p>
+            </div>
+            <p class="like-link-target"><span class="like-link"><a href="#" class="has-icon icon-like">Like review</a></span></p>
+          </div>
+        </li>''')
+    pages = sorted({1, 2, 3, max(1, page - 1), page, page + 1, last_page} - {0})
+    pagination = ''.join(
+        f'<li class="paginate-page"><a href="/film/{movie}/reviews/page/{p}/">{p:,}</a></li>'
+        for p in pages if p <= last_page
+    )
+    chrome = ''.join(f'<li class="navitem"><a href="/section/{n}/">Section {n}</a></li>' for n in range(60))
+    scripts = ''.join(f'<script>window.__data{n} = {{"id": {n}, "value": "{"x" * 200}"}};</script>' for n in range(20))
+    return f'''<!DOCTYPE html>
+<html lang="en"><head><title>Reviews of {movie}</title>{scripts}</head>
+<body class="reviews">
+  <header class="site-header"><nav><ul>{chrome}</ul></nav></header>
+  <div id="content"><section class="section col-main">
+    <ul class="film-popularity poster-list -p70 -grid">{''.join(items)}
+    </ul>
+    <div class="pagination"><div class="paginate-pages"><ul>{pagination}</ul></div></div>
+  </section>
+  <aside class="sidebar">{chrome}</aside></div>
+</body></html>'''
+
+def write_fixture_pages(directory: str, movie: str = 'fixture-movie', pages: int = 50) -> list[str]:
+    """Write review pages 1..pages to directory and return their paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for page in range(1, pages + 1):
+        path = os.path.join(directory, f'{movie}-{page}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(make_review_page(movie, page, pages))
+        paths.append(path)
+    return paths
@@ -0,0 +1,106 @@
+# benchmarks/load_test.py
+"""
+Load test for `senti serve`: concurrent clients post single texts for a fixed
+duration, then client-side latency percentiles and the server's /metrics
+are reported.
+
+Against a running server, or with --spawn to start one on a free port:
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --clients 64 --duration 10
+    python -m benchmarks.load_test --spawn --model vader
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+from benchmarks.fixtures import make_review_text
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+async def wait_until_up(session: aiohttp.ClientSession, url: str, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            async with session.get(f"{url}/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+async def client(session: aiohttp.ClientSession, url: str, texts: list[str], stop_at: float,
+                 latencies: list[float], errors: list[int]):
+    i = 0
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        async with session.post(f"{url}/analyze", json={'text': texts[i % len(texts)]}) as response:
+            await response.read()
+            if response.status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(response.status)
+        i += 1
+
+async def load(url: str, clients: int, duration: float) -> dict:
+    rng = random.Random(0)
+    texts = [make_review_text(rng) for _ in range(1000)]
+    latencies, errors = [], []
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await wait_until_up(session, url)
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session, url, texts[c::clients] or texts, started + duration, latencies, errors)
+                               for c in range(clients)))
+        elapsed = time.perf_counter() - started
+        async with session.get(f"{url}/metrics") as response:
+            server = await response.json()
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        'clients': clients,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(pick(0.50), 2),
+        'p99_ms': round(pick(0.99), 2),
+        'server': server
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--spawn', action='store_true', help="Start a local senti serve for the test")
+    parser.add_argument('--model', default='vader')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if args.spawn:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen([sys.executable, '-m', 'sentiment_analysis.app.main', 'serve',
+                                   '--model', args.model, '--port', str(port),
+                                   '--max-wait-ms', str(args.max_wait_ms)])
+    try:
+        print(json.dumps(asyncio.run(load(url, args.clients, args.duration)), indent=2))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
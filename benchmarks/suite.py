@@ -0,0 +1,320 @@
+# benchmarks/suite.py
+"""
+Benchmark suite for every pipeline stage: scraping from a local stand-in
+server, cleaning, scoring per model, aggregation and plotting. Each
+measurement runs in a fresh process, so its peak RSS is its own.
+
+Run from the repository root, writing machine-readable JSON and comparing
+against an earlier run:
+    python -m benchmarks.suite --sizes 10000,100000 --output out/bench/latest.json
+    python -m benchmarks.suite --baseline out/bench/baseline.json --tolerance 0.1
+
+The scrape stage serves synthetic fixture pages by default, or the pages
+recorded in a page cache (senti scrape --http-cache):
+    python -m benchmarks.suite --stages scrape --pages-from out/cache/pages.sqlite --movie wicked-2024
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmarks.fixtures import make_review_page, make_review_text
+
+STAGES = ('scrape', 'clean', 'score', 'aggregate', 'plot')
+MODEL_STAGES = ('score', 'aggregate', 'plot')
+# Metric of each stage that the baseline comparison checks
+THROUGHPUT = {'scrape': 'pages_per_s', 'clean': 'rows_per_s', 'score': 'rows_per_s',
+              'aggregate': 'seconds', 'plot': 'seconds'}
+
+def make_texts(rows: int, seed: int = 0) -> list[str]:
+    """Review texts with the fixture mix of lengths, emojis and languages"""
+    rng = random.Random(seed)
+    return [make_review_text(rng) for _ in range(rows)]
+
+def make_review_scores(rows: int, seed: int = 0) -> np.ndarray:
+    """Normalized review scores as CsvCleaner produces them"""
+    return np.round(np.random.default_rng(seed).integers(0, 10, rows) / 9, 2)
+
+def make_sentiments(rows: int, score_keys, seed: int = 0) -> dict:
+    """Random score arrays shaped like a model's analyze_batch output"""
+    rng = np.random.default_rng(seed)
+    sentiments = {key: rng.random(rows) for key in score_keys}
+    sentiments['compound'] = rng.uniform(-1, 1, rows)
+    return sentiments
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def recorded_pages(source: str, movie: str, pages: int) -> dict:
+    """Response bodies by URL path: from a page cache, or rendered fixture pages"""
+    if source:
+        from sentiment_analysis.sources.letterboxd.page_cache import PageCache
+        with PageCache(source) as cache:
+            return {urlsplit(url).path: cache.get(url).html for url in cache.urls()}
+    return {f'/film/{movie}/reviews/page/{page}/': make_review_page(movie, page, pages)
+            for page in range(1, pages + 1)}
+
+def serve(port: int, source: str, movie: str, pages: int, latency: float):
+    """Stand-in for letterboxd.com that answers from recorded pages and 404s everything else"""
+    from aiohttp import web
+
+    bodies = recorded_pages(source, movie, pages)
+
+    async def page(request):
+        if latency:
+            await asyncio.sleep(latency)
+        body = bodies.get(request.path)
+        if body is None:
+            return web.Response(status=404)
+        return web.Response(text=body, content_type='text/html')
+
+    async def health(request):
+        return web.Response(text='ok')
+
+    app = web.Application()
+    app.router.add_get('/health', health)
+    app.router.add_get('/{tail:.*}', page)
+    web.run_app(app, host='127.0.0.1', port=port, print=None)
+
+def wait_for_server(url: str, timeout: float = 60.0):
+    from urllib.request import urlopen
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urlopen(f"{url}/health") as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Stand-in server at {url} did not come up")
+
+def bench_scrape(spec: dict) -> dict:
+    from sentiment_analysis.sources.letterboxd.crawler import CrawlStats
+    from sentiment_analysis.sources.letterboxd.scraper import async_scrape_reviews
+
+    port = free_port()
+    repo_root = os.getcwd()
+    pages_from = os.path.abspath(spec['pages_from']) if spec['pages_from'] else ''
+    server = subprocess.Popen([sys.executable, '-m', 'benchmarks.suite', '--serve', str(port),
+                               '--pages-from', pages_from, '--movie', spec['movie'],
+                               '--pages', str(spec['pages']), '--latency-ms', str(spec['latency_ms'])],
+                              cwd=repo_root)
+    # The scraper resumes after the reviews stored under out/db; crawl from an empty
+    # working directory so every run fetches all pages, whatever is stored locally
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            os.chdir(workdir)
+            url = f"http://127.0.0.1:{port}"
+            wait_for_server(url)
+            stats = CrawlStats()
+            reviews = asyncio.run(async_scrape_reviews(f"{url}/film", spec['movie'], spec['concurrency'],
+                                                       max_concurrency=spec['concurrency'], stats=stats))
+        finally:
+            os.chdir(repo_root)
+            server.terminate()
+            server.wait()
+    return {'pages': stats.pages, 'reviews': len(reviews), 'seconds': stats.elapsed,
+            'pages_per_s': stats.pages_per_second}
+
+def bench_clean(spec: dict) -> dict:
+    from sentiment_analysis.workflow.cleaning import CsvCleaner, TextCleaner
+
+    texts = make_texts(spec['rows'])
+    cleaner = CsvCleaner(TextCleaner(), workers=spec['workers'])
+    started = time.perf_counter()
+    cleaner.preprocess_reviews(texts)
+    seconds = time.perf_counter() - started
+    return {'rows': len(texts), 'seconds': seconds, 'rows_per_s': len(texts) / seconds}
+
+def bench_score(spec: dict) -> dict:
+    from sentiment_analysis.workflow.sentiment_analyzer import SentimentAnalyzer
+
+    texts = make_texts(spec['rows'])
+    analyzer = SentimentAnalyzer(spec['model'], workers=spec['workers'])
+    started = time.perf_counter()
+    analyzer.score_reviews(texts)
+    seconds = time.perf_counter() - started
+    return {'rows': len(texts), 'seconds': seconds, 'rows_per_s': len(texts) / seconds}
+
+def bench_aggregate(spec: dict) -> dict:
+    from sentiment_analysis.workflow.sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer(spec['model'])
+    scores = make_review_scores(spec['rows'])
+    sentiments = make_sentiments(spec['rows'], analyzer.model.score_keys)
+    seconds = float('inf')
+    for _ in range(3):
+        started = time.perf_counter()
+        analyzer.results_from_scores(scores, sentiments)
+        seconds = min(seconds, time.perf_counter() - started)
+    return {'rows': spec['rows'], 'seconds': seconds, 'rows_per_s': spec['rows'] / seconds}
+
+def bench_plot(spec: dict) -> dict:
+    import matplotlib
+    matplotlib.use('Agg')
+    from sentiment_analysis.workflow.plotter import SentimentPlotter
+    from sentiment_analysis.workflow.sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer(spec['model'])
+    scores = make_review_scores(spec['rows'])
+    results = analyzer.results_from_scores(scores, make_sentiments(spec['rows'], analyzer.model.score_keys))
+    with tempfile.TemporaryDirectory() as out_dir:
+        plotter = SentimentPlotter(out_dir)
+        started = time.perf_counter()
+        plotter.plot_all(results, 'bench', spec['model'], show=False)
+        seconds = time.perf_counter() - started
+    return {'rows': spec['rows'], 'seconds': seconds, 'rows_per_s': spec['rows'] / seconds}
+
+BENCHES = {'scrape': bench_scrape, 'clean': bench_clean, 'score': bench_score,
+           'aggregate': bench_aggregate, 'plot': bench_plot}
+
+def run_child(spec: dict) -> dict:
+    """Run one measurement in this process and add its peak memory"""
+    result = BENCHES[spec['stage']](spec)
+    # ru_maxrss is in kilobytes on Linux
+    result['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    result['peak_rss_children_mb'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return {key: round(value, 6) if isinstance(value, float) else value for key, value in result.items()}
+
+def measure(spec: dict) -> dict:
+    """Run one measurement in a fresh interpreter"""
+    completed = subprocess.run([sys.executable, '-m', 'benchmarks.suite', '--child', json.dumps(spec)],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'failed'}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def benchmark_id(spec: dict) -> str:
+    if spec['stage'] == 'scrape':
+        return f"scrape/recorded/{spec['movie']}" if spec['pages_from'] else f"scrape/{spec['pages']}pages"
+    if spec['stage'] in MODEL_STAGES:
+        return f"{spec['stage']}/{spec['model']}/{spec['rows']}"
+    return f"{spec['stage']}/{spec['rows']}"
+
+def plan(args) -> list[dict]:
+    specs = []
+    for stage in args.stages:
+        if stage == 'scrape':
+            specs.append({'stage': stage, 'pages': args.pages, 'pages_from': args.pages_from,
+                          'movie': args.movie, 'latency_ms': args.latency_ms,
+                          'concurrency': args.concurrency})
+            continue
+        for rows in args.sizes:
+            if stage == 'clean':
+                specs.append({'stage': stage, 'rows': min(rows, args.max_clean_rows), 'workers': args.workers})
+            for model in (args.models if stage in MODEL_STAGES else ()):
+                specs.append({'stage': stage, 'rows': rows, 'model': model, 'workers': args.workers})
+    # The same clean size can come from several capped sizes
+    unique = {benchmark_id(spec): spec for spec in specs}
+    return list(unique.values())
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print the change of every benchmark in both runs and return the ones that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<28} {'metric':<12} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if not old or 'error' in result or 'error' in old:
+            continue
+        for metric in (THROUGHPUT[name.split('/')[0]], 'peak_rss_mb'):
+            before, after = old[metric], result[metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            # For seconds and memory lower is better, for throughput higher is better
+            worse = change > tolerance if metric in ('seconds', 'peak_rss_mb') else change < -tolerance
+            flag = '  REGRESSION' if worse else ''
+            print(f"{name:<28} {metric:<12} {before:>12.3f} {after:>12.3f} {change:>+7.1%}{flag}")
+            if worse:
+                regressions.append(f"{name} {metric}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stages', default=','.join(STAGES), help="Comma-separated stages to run")
+    parser.add_argument('--sizes', default='10000,100000', help="Comma-separated corpus sizes, e.g. 10000,100000,1000000")
+    parser.add_argument('--models', default='vader,logreg')
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for cleaning and scoring")
+    parser.add_argument('--max-clean-rows', type=int, default=100000, help="Cap on rows for the clean stage")
+    parser.add_argument('--pages', type=int, default=200, help="Fixture pages served to the scraper")
+    parser.add_argument('--pages-from', default=None, help="Page cache (.sqlite) with recorded pages to serve")
+    parser.add_argument('--movie', default='bench-fixture', help="Movie slug to scrape from the stand-in server")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Simulated server latency per page")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--output', default='out/bench/latest.json')
+    parser.add_argument('--baseline', default=None, help="Earlier result file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Relative change counted as a regression")
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--serve', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return
+    if args.serve:
+        serve(args.serve, args.pages_from, args.movie, args.pages, args.latency_ms / 1000)
+        return
+
+    args.stages = [stage for stage in args.stages.split(',') if stage]
+    args.sizes = [int(size) for size in args.sizes.split(',') if size]
+    args.models = [model for model in args.models.split(',') if model]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'workers': args.workers
+        },
+        'results': {}
+    }
+    for spec in plan(args):
+        name = benchmark_id(spec)
+        result = report['results'][name] = measure(spec)
+        if 'error' in result:
+            print(f"{name:<28} failed: {result['error']}")
+            continue
+        metric = THROUGHPUT[spec['stage']]
+        print(f"{name:<28} {metric:<12} {result[metric]:>12.3f}   {result['seconds']:8.3f}s   "
+              f"peak RSS {result['peak_rss_mb']:7.1f} MB")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
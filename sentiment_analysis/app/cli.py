@@ -1,17 +1,16 @@
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 import typer
 import json
 from pathlib import Path
 import time
-import asyncio
-
-from ..workflow import SentimentAnalyzer, SentimentPlotter
-from ..workflow.cleaning import TextCleaner, CsvCleaner
-from ..sources.letterboxd.scraper import async_scrape_reviews, BASE_URL
-from ..sources.letterboxd.db import save_reviews
 
 from . import __app_name__, __version__
 
+# Commands import their dependencies when they run, so light commands such as
+# --version or analyze --text do not pay for pandas, scikit-learn or nltk
+if TYPE_CHECKING:
+    from ..sources.letterboxd.page_cache import PageCache
+
 app = typer.Typer()
 
 def _version_callback(value: bool):
@@ -19,79 +18,396 @@ def _version_callback(value: bool):
         typer.echo(f"{__app_name__} version: {__version__}")
         raise typer.Exit()
 
+def _finish_metrics(profiler, profile_path: Optional[str], metrics_out: Optional[str]):
+    """Print and store the metrics and profile of the command that just ran"""
+    from .. import metrics
+
+    recorder = metrics.stop()
+    if profiler is not None:
+        import io
+        import pstats
+
+        profiler.disable()
+        Path(profile_path).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(profile_path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(20)
+        typer.echo(out.getvalue(), err=True)
+        typer.echo(recorder.summary(), err=True)
+        typer.echo(f"Profile written to '{profile_path}'", err=True)
+    if metrics_out:
+        recorder.write(metrics_out)
+        typer.echo(f"Metrics written to '{metrics_out}'", err=True)
+
 @app.callback()
 def version(
+    ctx: typer.Context,
     version: Optional[bool] = typer.Option(
         None,
         "--version",
         help="Show the application's version and exit.",
         callback=_version_callback,
         is_eager=True,
-    )
+    ),
+    profile: bool = typer.Option(False, "--profile", help="Profile the command with cProfile and print per-stage timings"),
+    profile_out: Optional[str] = typer.Option(None, "--profile-out", help="pstats dump of --profile (default: out/profile/<command>.prof)"),
+    metrics_out: Optional[str] = typer.Option(None, "--metrics-out", help="JSON file for per-stage timings, counters and peak memory"),
 ) -> None:
-    return
+    if not (profile or metrics_out):
+        return
+    from .. import metrics
+
+    command = ctx.invoked_subcommand or ''
+    metrics.start(command)
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    ctx.call_on_close(lambda: _finish_metrics(profiler, profile_out or f'out/profile/{command}.prof', metrics_out))
+
+def _clean_scraped(movie: str, fmt: str, workers: int):
+    """Clean the stored raw reviews of a movie"""
+    from ..workflow.cleaning import TextCleaner, CsvCleaner
+    from ..sources.letterboxd.db import review_path, load_reviews_frame
+
+    cleaner = CsvCleaner(TextCleaner(), workers=workers, fmt='csv' if fmt == 'sqlite' else fmt)
+    if fmt == 'sqlite':
+        cleaner.clean_frame(load_reviews_frame(movie, ['review', 'score'], fmt), movie)
+    else:
+        cleaner.clean_csv(review_path(movie, fmt), movie)
+
+def _echo_page_cache(page_cache: Optional['PageCache']):
+    if page_cache:
+        stats = page_cache.stats()
+        typer.echo(f"Page cache: {stats['not_modified']} not modified, {stats['fetched']} fetched "
+                   f"({stats['entries']} entries)")
+
+def _echo_results(results: dict, model: str):
+    typer.echo(f"\n{model.upper()} Analysis Results")
+    typer.echo("-" * 50)
+    typer.echo(f"Total Reviews: {results['total_reviews']}")
+    
+    typer.echo("\nAverage Scores:")
+    for metric, score in results['average_scores'].items():
+        typer.echo(f"  {metric.title()}: {score:.3f}")
+    
+    typer.echo("\nSentiment Distribution:")
+    for sentiment, count in results['sentiment_distribution'].items():
+        typer.echo(f"  {sentiment.title()}: {count}")
+    
+    typer.echo("\nScore Comparison:")
+    comp = results['comparison']
+    typer.echo(f"  Correlation: {comp['correlation']:.3f}")
+    typer.echo(f"  Mean Absolute Error: {comp['mae']:.3f}")
+    typer.echo(f"  Root Mean Square Error: {comp['rmse']:.3f}")
 
 @app.command(help="Scrape movie reviews from Letterboxd.")
 def scrape(
-    movie: str = typer.Argument(..., help="Movie name (e.g. 'wicked-2024')"),
+    movie: Optional[str] = typer.Argument(None, help="Movie name (e.g. 'wicked-2024')"),
+    from_file: Optional[str] = typer.Option(None, "--from-file", help="Text file with one movie name per line to scrape in one batch"),
     clean: bool = typer.Option(False, "--clean", help="Clean scraped data immediately"),
+    workers: int = typer.Option(1, "--workers", help="Number of worker processes used for cleaning"),
+    fmt: str = typer.Option('csv', "--format", help="Storage format for raw reviews (csv/parquet/sqlite)"),
+    concurrency: int = typer.Option(5, "--concurrency", help="Initial number of concurrent page requests"),
+    max_concurrency: int = typer.Option(32, "--max-concurrency", help="Upper bound for the adaptive request concurrency"),
+    movies_at_once: int = typer.Option(4, "--movies-at-once", help="Movies crawled side by side in batch mode"),
+    parse_processes: int = typer.Option(0, "--parse-processes", help="Worker processes for HTML parsing (0 = one background thread)"),
+    http_cache: bool = typer.Option(False, "--http-cache", help="Cache pages and send conditional requests (ETag/Last-Modified)"),
+    http_cache_path: str = typer.Option('out/cache/pages.sqlite', "--http-cache-path", help="Path of the page cache database"),
+    replay: bool = typer.Option(False, "--replay", help="Scrape offline from the page cache instead of the network"),
+    sync: bool = typer.Option(False, "--sync", help="Fetch only new reviews, newest first, until a page of known reviews"),
 ):
-    """Scrape reviews for a movie from Letterboxd and optionally clean the data"""
+    """Scrape reviews for one movie, or a batch of movies, from Letterboxd and optionally clean the data"""
+    
+    if (movie is None) == (from_file is None):
+        typer.echo("Error: Pass either a movie name or --from-file")
+        raise typer.Exit(1)
+    if movies_at_once < 1:
+        typer.echo("Error: --movies-at-once must be at least 1")
+        raise typer.Exit(1)
+
+    import asyncio
+    from ..sources.letterboxd.scraper import async_scrape_reviews, scrape_movies, read_movie_list, BASE_URL
+    from ..sources.letterboxd.crawler import CrawlStats
+    from ..sources.letterboxd.page_cache import PageCache
+    from ..sources.letterboxd.db import REVIEW_FORMATS, append_reviews, review_path
+    from .. import metrics
+
+    # Checked before crawling: the reviews are only stored once every page is fetched
+    if fmt not in REVIEW_FORMATS:
+        typer.echo(f"Error: Unknown format '{fmt}' (expected one of {', '.join(REVIEW_FORMATS)})")
+        raise typer.Exit(1)
     
     start_time = time.time()
+    page_cache = PageCache(http_cache_path) if http_cache or replay else None
     try:
-        reviews = asyncio.run(async_scrape_reviews(BASE_URL, movie))
-        save_reviews(reviews, movie)
+        if from_file:
+            movies = read_movie_list(from_file)
+
+            def save_movie(name, reviews, stats):
+                with metrics.stage('store') as record:
+                    written = record['rows'] = append_reviews(reviews, name, fmt)
+                typer.echo(f"{name}: saved {written} new reviews to '{review_path(name, fmt)}' ({stats.summary()})")
+
+            results = asyncio.run(scrape_movies(BASE_URL, movies, concurrency, fmt=fmt,
+                                                max_concurrency=max_concurrency, movies_at_once=movies_at_once,
+                                                parse_processes=parse_processes, on_movie_done=save_movie,
+                                                cache=page_cache, replay=replay, sync=sync))
+            scrape_time = time.time() - start_time
+            pages = sum(stats.pages for stats in results.values())
+            reviews = sum(stats.reviews for stats in results.values())
+            typer.echo(f"Scraped {len(movies)} movies ({pages} pages, {reviews} reviews) in {scrape_time:.2f} seconds")
+            _echo_page_cache(page_cache)
+            if clean:
+                for name in movies:
+                    try:
+                        _clean_scraped(name, fmt, workers)
+                    except Exception as e:
+                        typer.echo(f"Error cleaning {name}: {e}")
+            return
+
+        stats = CrawlStats()
+        reviews = asyncio.run(async_scrape_reviews(BASE_URL, movie, concurrency, fmt=fmt,
+                                                   max_concurrency=max_concurrency, stats=stats,
+                                                   parse_processes=parse_processes, cache=page_cache,
+                                                   replay=replay, sync=sync))
+        with metrics.stage('store') as record:
+            written = record['rows'] = append_reviews(reviews, movie, fmt)
         
         scrape_time = time.time() - start_time
         typer.echo(f"Scraped {len(reviews)} reviews in {scrape_time:.2f} seconds")
-        typer.echo(f"Saved to 'out/db/letterboxd/raw/{movie}.csv'")
+        typer.echo(f"Crawl: {stats.summary()}")
+        typer.echo(f"Saved {written} new reviews to '{review_path(movie, fmt)}'")
+        _echo_page_cache(page_cache)
         
         if clean:
-            cleaner = CsvCleaner(TextCleaner())
-            cleaner.clean_csv(f'out/db/letterboxd/raw/{movie}.csv', movie)
+            _clean_scraped(movie, fmt, workers)
             
     except Exception as e:
         typer.echo(f"Error: {e}")
         raise typer.Exit(1)
+    finally:
+        if page_cache:
+            page_cache.close()
     
+@app.command(help="Scrape, clean and analyze a movie's reviews as one streaming pipeline.")
+def run(
+    movie: str = typer.Argument(..., help="Movie name (e.g. 'wicked-2024')"),
+    model: str = typer.Option('vader', "--model", help="Model to use (vader/logreg)"),
+    workers: int = typer.Option(1, "--workers", help="Number of worker processes used for cleaning"),
+    fmt: str = typer.Option('csv', "--format", help="Storage format for raw reviews (csv/parquet/sqlite)"),
+    concurrency: int = typer.Option(5, "--concurrency", help="Initial number of concurrent page requests"),
+    max_concurrency: int = typer.Option(32, "--max-concurrency", help="Upper bound for the adaptive request concurrency"),
+    parse_processes: int = typer.Option(0, "--parse-processes", help="Worker processes for HTML parsing (0 = one background thread)"),
+    queue_size: int = typer.Option(8, "--queue-size", help="Batches buffered between two stages before the earlier one waits"),
+    batch_size: int = typer.Option(256, "--batch-size", help="Reviews cleaned or scored per batch"),
+    output: Optional[str] = typer.Option(None, "--output", help="CSV file for per-review scores (default: out/scores/<movie>.csv)"),
+    http_cache: bool = typer.Option(False, "--http-cache", help="Cache pages and send conditional requests (ETag/Last-Modified)"),
+    http_cache_path: str = typer.Option('out/cache/pages.sqlite', "--http-cache-path", help="Path of the page cache database"),
+    replay: bool = typer.Option(False, "--replay", help="Scrape offline from the page cache instead of the network"),
+    sync: bool = typer.Option(False, "--sync", help="Fetch only new reviews, newest first, until a page of known reviews"),
+    jsonl: bool = typer.Option(False, "--jsonl", help="Output the results in JSONL format"),
+):
+    """Scrape, clean and score new reviews concurrently, writing scores as they are produced"""
+    import sys
+    from contextlib import redirect_stdout
+    from ..sources.letterboxd.db import REVIEW_FORMATS
+    from ..sources.letterboxd.scraper import BASE_URL
+    from ..sources.letterboxd.page_cache import PageCache
+    from ..workflow.pipeline import run_pipeline
+
+    if fmt not in REVIEW_FORMATS:
+        typer.echo(f"Error: Unknown format '{fmt}' (expected one of {', '.join(REVIEW_FORMATS)})")
+        raise typer.Exit(1)
+
+    output = output or f'out/scores/{movie}.csv'
+    page_cache = PageCache(http_cache_path) if http_cache or replay else None
+    try:
+        # Keep stdout to the JSON line; progress messages go to stderr
+        with redirect_stdout(sys.stderr if jsonl else sys.stdout):
+            results, stats = run_pipeline(movie, BASE_URL, model, fmt, workers, queue_size, batch_size, output,
+                                          cache=page_cache, replay=replay, sync=sync,
+                                          parse_processes=parse_processes, concurrency=concurrency,
+                                          max_concurrency=max_concurrency)
+        typer.echo(f"Pipeline: {stats.summary()}", err=jsonl)
+        typer.echo(f"Crawl: {stats.crawl.summary()}", err=jsonl)
+        if stats.scored:
+            typer.echo(f"Scores written to '{output}'", err=jsonl)
+        if not jsonl:
+            _echo_page_cache(page_cache)
+        if jsonl:
+            typer.echo(json.dumps(results))
+        elif stats.scored:
+            _echo_results(results, model)
+    except Exception as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(1)
+    finally:
+        if page_cache:
+            page_cache.close()
+
 @app.command(help="Clean and preprocess review data.")
 def clean(
-    csv: str = typer.Argument(..., help="Path to CSV file to clean"),
+    csv: str = typer.Argument(..., help="Path to CSV or Parquet file to clean"),
+    workers: int = typer.Option(1, "--workers", help="Number of worker processes used for cleaning"),
+    fmt: str = typer.Option('csv', "--format", help="Storage format for the cleaned reviews (csv/parquet)"),
 ):
     """Clean and preprocess review data"""
+    from ..workflow.cleaning import TextCleaner, CsvCleaner
     
     try:
         movie_name = Path(csv).stem
-        cleaner = CsvCleaner(TextCleaner())
+        cleaner = CsvCleaner(TextCleaner(), workers=workers, fmt=fmt)
         cleaner.clean_csv(csv, movie_name)
     except Exception as e:
         typer.echo(f"Error cleaning data: {e}")
         raise typer.Exit(1)
 
+@app.command(help="Convert raw review CSVs to Parquet.")
+def migrate(
+    remove_csv: bool = typer.Option(False, "--remove-csv", help="Delete each CSV after converting it"),
+):
+    """Convert every raw review CSV in out/db/letterboxd/raw to Parquet"""
+    from ..sources.letterboxd.db import migrate_to_parquet
+    
+    try:
+        migrated = migrate_to_parquet(remove_csv)
+        typer.echo(f"Migrated {len(migrated)} files to Parquet")
+    except Exception as e:
+        typer.echo(f"Error migrating data: {e}")
+        raise typer.Exit(1)
+
+@app.command(name="export-model", help="Export the LogReg model as memory-mapped NumPy arrays.")
+def export_model(
+    output: str = typer.Option('assets/models/logreg_compact', "--output", help="Directory for the compact model"),
+):
+    """Convert the joblib LogReg model and vectorizer into the compact format LogRegModel loads first"""
+    from ..models.logreg_model import LogRegModel
+    
+    try:
+        out_dir = LogRegModel(use_compact=False).export_compact(output)
+        typer.echo(f"Exported compact LogReg model to '{out_dir}'")
+    except Exception as e:
+        typer.echo(f"Error exporting model: {e}")
+        raise typer.Exit(1)
+
+@app.command(help="Train the LogReg model out-of-core on cleaned reviews.")
+def train(
+    csv: Optional[List[str]] = typer.Option(None, "--csv", help="Clean CSV or Parquet file to train on (repeatable)"),
+    directory: str = typer.Option('out/db/letterboxd/clean', "--dir", help="Directory of clean files to train on when no --csv is given"),
+    output: str = typer.Option('out/models/logreg', "--output", help="Directory to write the model and vectorizer to"),
+    warm_start: bool = typer.Option(False, "--warm-start", help="Continue training the model in --output instead of starting over"),
+    epochs: int = typer.Option(1, "--epochs", help="Passes over the training reviews"),
+    chunk_size: int = typer.Option(50000, "--chunk-size", help="Reviews read and fitted per step"),
+    holdout: float = typer.Option(0.1, "--holdout", help="Share of reviews held out for evaluation"),
+    positive_from: float = typer.Option(0.6, "--positive-from", help="Normalized score from which a review counts as positive"),
+    negative_to: float = typer.Option(0.4, "--negative-to", help="Normalized score up to which a review counts as negative"),
+    n_features: int = typer.Option(2 ** 20, "--n-features", help="Number of hashed features of a new model"),
+    alpha: float = typer.Option(1e-5, "--alpha", help="L2 regularization strength of a new model"),
+):
+    """Stream clean review files through a hashing vectorizer and an incrementally fitted classifier"""
+    from ..workflow.corpus import find_movie_files
+    from ..workflow.training import train_logreg
+
+    paths = csv or list(find_movie_files(directory).values())
+    if not paths:
+        typer.echo(f"No clean review files found in '{directory}'")
+        raise typer.Exit(1)
+
+    try:
+        report = train_logreg(paths, output, warm_start, epochs, chunk_size=chunk_size, holdout=holdout,
+                              positive_from=positive_from, negative_to=negative_to,
+                              n_features=n_features, alpha=alpha)
+        typer.echo(report.summary())
+        typer.echo(f"Model written to '{output}'")
+    except Exception as e:
+        typer.echo(f"Error training model: {e}")
+        raise typer.Exit(1)
+
+@app.command(help="Serve sentiment scores over HTTP with the model kept in memory.")
+def serve(
+    model: str = typer.Option('vader', "--model", help="Model to use (vader/logreg)"),
+    host: str = typer.Option('127.0.0.1', "--host", help="Interface to listen on"),
+    port: int = typer.Option(8000, "--port", help="TCP port to listen on"),
+    socket: Optional[str] = typer.Option(None, "--socket", help="Listen on this Unix domain socket instead of TCP"),
+    max_batch: int = typer.Option(256, "--max-batch", help="Maximum number of texts scored in one batch"),
+    max_wait_ms: float = typer.Option(5.0, "--max-wait-ms", help="How long a batch waits for more requests"),
+    model_dir: Optional[str] = typer.Option(None, "--model-dir", help="Directory of the LogReg model files, e.g. from senti train (default: assets/models)"),
+):
+    """Keep a model loaded and score texts posted to /analyze in micro-batches"""
+    from .server import run_server
+    
+    if model_dir and model != 'logreg':
+        typer.echo("--model-dir only applies to --model logreg")
+        raise typer.Exit(1)
+
+    typer.echo(f"Serving {model} on {socket or f'http://{host}:{port}'} "
+               f"(batches of up to {max_batch}, {max_wait_ms:g} ms window)")
+    try:
+        run_server(model, host, port, socket, max_batch, max_wait_ms / 1000, model_dir)
+    except Exception as e:
+        typer.echo(f"Error serving: {e}")
+        raise typer.Exit(1)
+
 @app.command(help="Analyze sentiment of text or reviews in CSV.")
 def analyze(
-    csv: Optional[str] = typer.Option(None, "--csv", help="Path to CSV file containing reviews"),
+    csv: Optional[str] = typer.Option(None, "--csv", help="Path to CSV or Parquet file containing reviews"),
     text: Optional[str] = typer.Option(None, "--text", help="Single text to analyze"),
     model: str = typer.Option('vader', "--model", help="Model to use (vader/logreg)"),
     graph: Optional[str] = typer.Option(None, "--graph", help="Plot type (distribution/comparison/averages/all)"),
     output: str = typer.Option('out/plots', "--output", help="Directory to save plots (default: out/plots)"),
+    plot_mode: str = typer.Option('auto', "--plot-mode", help="Comparison plots from every review (exact), from binned data (binned) or by size (auto)"),
+    plot_sample: Optional[int] = typer.Option(None, "--plot-sample", help="Overlay a stratified sample of this many reviews on binned plots"),
     jsonl: bool = typer.Option(False, "--jsonl", help="Output in JSONL format. This includes vector data."),
+    workers: int = typer.Option(1, "--workers", help="Number of worker processes used for scoring"),
+    stream: bool = typer.Option(False, "--stream", help="Read the CSV in chunks and aggregate in bounded memory"),
+    chunk_size: int = typer.Option(50000, "--chunk-size", help="Rows per chunk in streaming mode"),
+    scores_out: Optional[str] = typer.Option(None, "--scores-out", help="CSV file to write per-review scores to in streaming mode"),
+    cache: bool = typer.Option(False, "--cache", help="Reuse previously computed scores from the on-disk score cache"),
+    cache_path: str = typer.Option('out/cache/scores.sqlite', "--cache-path", help="Location of the score cache"),
+    cache_size: int = typer.Option(5_000_000, "--cache-size", help="Maximum number of cached scores (LRU eviction)"),
+    features: bool = typer.Option(False, "--features", help="Score logreg from the TF-IDF matrix stored next to the CSV, building it on first use"),
+    directory: Optional[str] = typer.Option(None, "--dir", help="Directory of clean CSV/Parquet files to summarize, one per movie"),
+    summary_out: str = typer.Option('out/summary', "--summary-out", help="Directory of the summary table and index (with --dir)"),
+    summary_format: str = typer.Option('csv', "--summary-format", help="Summary table format (csv/parquet)"),
+    force: bool = typer.Option(False, "--force", help="Re-score movies whose summary rows are up to date (with --dir)"),
+    model_dir: Optional[str] = typer.Option(None, "--model-dir", help="Directory of the LogReg model files, e.g. from senti train (default: assets/models)"),
 ):
     """Analyze sentiment using specified model and display/save results"""
-    if not csv and not text:
-        typer.echo("Either --csv or --text must be provided")
+    if sum(bool(source) for source in (csv, text, directory)) != 1:
+        typer.echo("Exactly one of --csv, --text or --dir must be provided")
         raise typer.Exit(1)
-    
-    if csv and text:
-        typer.echo("Cannot use both --csv and --text together")
+
+    if directory and graph:
+        typer.echo("Graphs are not available with --dir")
         raise typer.Exit(1)
 
-    analyzer = SentimentAnalyzer(model)
-    plotter = SentimentPlotter(output) if graph else None
-    
+    # Checked before scoring, as SentimentPlotter only sees it once the reviews are analyzed
+    if plot_mode not in ('auto', 'exact', 'binned'):
+        typer.echo(f"Unknown plot mode: {plot_mode} (expected auto, exact or binned)")
+        raise typer.Exit(1)
+
+    if stream and graph in ('comparison', 'all'):
+        typer.echo(f"Graph '{graph}' needs per-review scores and is not available with --stream")
+        raise typer.Exit(1)
+
+    if features and (stream or directory or text):
+        typer.echo("--features needs a whole --csv file and is not available with --stream, --dir or --text")
+        raise typer.Exit(1)
+
+    if features and model != 'logreg':
+        typer.echo("--features only applies to --model logreg")
+        raise typer.Exit(1)
+
+    if model_dir and model != 'logreg':
+        typer.echo("--model-dir only applies to --model logreg")
+        raise typer.Exit(1)
+    model_options = {'model_dir': model_dir} if model_dir else {}
+
     if text:
-        sentiment = analyzer.model.analyze(text)
+        from ..models import get_model
+        sentiment = get_model(model, **model_options).analyze(text)
         if jsonl:
             typer.echo(json.dumps({"text": text, "sentiment": sentiment}))
         else:
@@ -99,30 +415,57 @@ def analyze(
             typer.echo(f"Sentiment: {json.dumps(sentiment, indent=2)}")
         return
     
+    from ..workflow.sentiment_analyzer import SentimentAnalyzer
+    from ..workflow.score_cache import ScoreCache
+    
+    score_cache = ScoreCache(cache_path, cache_size) if cache else None
+    analyzer = SentimentAnalyzer(model, workers=workers, cache=score_cache, features=features,
+                                 model_dir=model_dir)
+
+    if directory:
+        from ..workflow.corpus import analyze_corpus
+
+        def report(movie, row):
+            if row is None:
+                typer.echo(f"{movie}: up to date, skipped", err=jsonl)
+            else:
+                typer.echo(f"{movie}: {row['total_reviews']} reviews, "
+                           f"avg compound {row['avg_compound']:.3f}", err=jsonl)
+
+        try:
+            summary = analyze_corpus(analyzer, directory, summary_out, summary_format,
+                                     chunk_size, force, on_movie=report)
+            if jsonl:
+                for row in summary.to_dict(orient='records'):
+                    typer.echo(json.dumps(row))
+            else:
+                typer.echo(f"Summary of {summary['movie'].nunique()} movies written to {summary_out}")
+        except Exception as e:
+            typer.echo(f"Error analyzing directory: {str(e)}")
+            raise typer.Exit(1)
+        finally:
+            if score_cache:
+                score_cache.close()
+        return
+    
     try:
-        results = analyzer.analyze_reviews(csv)
+        if stream:
+            results = analyzer.analyze_reviews_streaming(csv, chunk_size, scores_out)
+        else:
+            results = analyzer.analyze_reviews(csv)
         if jsonl:
             typer.echo(json.dumps(results))
         else:
-            typer.echo(f"\n{model.upper()} Analysis Results")
-            typer.echo("-" * 50)
-            typer.echo(f"Total Reviews: {results['total_reviews']}")
-            
-            typer.echo("\nAverage Scores:")
-            for metric, score in results['average_scores'].items():
-                typer.echo(f"  {metric.title()}: {score:.3f}")
-            
-            typer.echo("\nSentiment Distribution:")
-            for sentiment, count in results['sentiment_distribution'].items():
-                typer.echo(f"  {sentiment.title()}: {count}")
-            
-            typer.echo("\nScore Comparison:")
-            comp = results['comparison']
-            typer.echo(f"  Correlation: {comp['correlation']:.3f}")
-            typer.echo(f"  Mean Absolute Error: {comp['mae']:.3f}")
-            typer.echo(f"  Root Mean Square Error: {comp['rmse']:.3f}")
+            _echo_results(results, model)
+
+        if score_cache:
+            stats = score_cache.stats()
+            typer.echo(f"\nScore cache: {stats['hits']} hits, {stats['misses']} misses "
+                       f"({stats['entries']} entries)", err=jsonl)
         
-        if graph and plotter:
+        if graph:
+            from ..workflow.plotter import SentimentPlotter
+            plotter = SentimentPlotter(output, plot_mode, plot_sample)
             movie_name = Path(csv).stem
             if graph == 'distribution':
                 plotter.plot_sentiment_distribution(results, movie_name, model)
@@ -139,4 +482,7 @@ def analyze(
     except Exception as e:
         typer.echo(f"Error analyzing CSV: {str(e)}")
         raise typer.Exit(1)
+    finally:
+        if score_cache:
+            score_cache.close()
     
\ No newline at end of file
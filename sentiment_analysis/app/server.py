@@ -0,0 +1,189 @@
+# app/server.py
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+from ..models import get_model
+from ..models.base import SentimentModel
+
+class LatencyStats:
+    """Request counters plus latency percentiles over the most recent requests"""
+
+    def __init__(self, window: int = 10000):
+        self.started = time.perf_counter()
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.errors = 0
+
+    def record_batch(self, size: int):
+        self.batches += 1
+        self.texts += size
+
+    def record_request(self, latency: float):
+        self.requests += 1
+        self.latencies.append(latency)
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, float]:
+        uptime = time.perf_counter() - self.started
+        return {
+            'uptime_s': round(uptime, 3),
+            'requests': self.requests,
+            'texts': self.texts,
+            'batches': self.batches,
+            'errors': self.errors,
+            'mean_batch_size': round(self.texts / self.batches, 2) if self.batches else 0.0,
+            'texts_per_s': round(self.texts / uptime, 2) if uptime else 0.0,
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3)
+        }
+
+class MicroBatcher:
+    """
+    Collect texts from concurrent requests for up to max_wait seconds (or
+    max_batch texts) and score them with one analyze_batch call. Batches run
+    on a single worker thread so the event loop keeps accepting requests.
+    """
+
+    def __init__(self, model: SentimentModel, max_batch: int = 256, max_wait: float = 0.005,
+                 stats: Optional[LatencyStats] = None):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = stats or LatencyStats()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='score')
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        self.executor.shutdown(wait=False)
+
+    async def score(self, texts: Sequence[str]) -> List[Dict[str, float]]:
+        """Queue texts for the next batch and wait for their scores"""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self.queue.put_nowait((text, future))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Take whatever else is already waiting without delaying further
+        while len(batch) < self.max_batch and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                scores = await loop.run_in_executor(self.executor, self.model.analyze_batch, texts)
+            except Exception as e:
+                self.stats.errors += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats.record_batch(len(batch))
+            keys = list(scores)
+            columns = [scores[key].tolist() for key in keys]
+            for (_, future), values in zip(batch, zip(*columns)):
+                if not future.done():
+                    future.set_result(dict(zip(keys, values)))
+
+BATCHER = web.AppKey('batcher', MicroBatcher)
+
+def create_app(model_name: str = 'vader', max_batch: int = 256, max_wait: float = 0.005,
+               model_dir: Optional[str] = None) -> web.Application:
+    """
+    aiohttp application with the model loaded once:
+    POST /analyze  {"text": "..."} or {"texts": [...]}
+    GET  /metrics  request counters, batch sizes and p50/p99 latency
+    GET  /health
+    """
+    model = get_model(model_name, **({'model_dir': model_dir} if model_dir else {}))
+    stats = LatencyStats()
+
+    async def analyze(request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({'error': 'Body must be JSON'}, status=400)
+        if not isinstance(payload, dict):
+            return web.json_response({'error': "Expected 'text' or 'texts'"}, status=400)
+        if isinstance(payload.get('texts'), list):
+            texts, single = payload['texts'], False
+        elif isinstance(payload.get('text'), str):
+            texts, single = [payload['text']], True
+        else:
+            return web.json_response({'error': "Expected 'text' or 'texts'"}, status=400)
+
+        try:
+            scores = await request.app[BATCHER].score([str(t) for t in texts])
+        except Exception as e:
+            return web.json_response({'error': str(e)}, status=500)
+        stats.record_request(time.perf_counter() - started)
+        if single:
+            return web.json_response({'model': model_name, 'sentiment': scores[0]})
+        return web.json_response({'model': model_name, 'sentiments': scores})
+
+    async def metrics(request: web.Request) -> web.Response:
+        return web.json_response({'model': model_name, **stats.snapshot()})
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok'})
+
+    async def start_batcher(app: web.Application):
+        app[BATCHER] = MicroBatcher(model, max_batch, max_wait, stats)
+        app[BATCHER].start()
+
+    async def stop_batcher(app: web.Application):
+        await app[BATCHER].stop()
+
+    app = web.Application()
+    app.router.add_post('/analyze', analyze)
+    app.router.add_get('/metrics', metrics)
+    app.router.add_get('/health', health)
+    app.on_startup.append(start_batcher)
+    app.on_cleanup.append(stop_batcher)
+    return app
+
+def run_server(model_name: str = 'vader', host: str = '127.0.0.1', port: int = 8000,
+               socket_path: Optional[str] = None, max_batch: int = 256, max_wait: float = 0.005,
+               model_dir: Optional[str] = None):
+    """Serve until interrupted, over TCP or a Unix domain socket"""
+    app = create_app(model_name, max_batch, max_wait, model_dir)
+    if socket_path:
+        web.run_app(app, path=socket_path, print=None)
+    else:
+        web.run_app(app, host=host, port=port, print=None)
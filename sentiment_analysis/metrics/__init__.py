@@ -0,0 +1,11 @@
+# metrics/__init__.py
+from .recorder import RunMetrics, active, peak_rss_mb, stage, start, stop
+
+__all__ = [
+    'RunMetrics',
+    'active',
+    'peak_rss_mb',
+    'stage',
+    'start',
+    'stop'
+]
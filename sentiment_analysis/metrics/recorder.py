@@ -0,0 +1,115 @@
+# metrics/recorder.py
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Peak resident memory of this process (or of its finished children) in MB"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(usage.ru_maxrss / scale, 1)
+
+def _merge(totals: Dict, values: Dict):
+    """Add numbers and nested counters of values into totals; other values replace"""
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float, dict)):
+            totals[key] = value
+        elif isinstance(value, dict):
+            _merge(totals.setdefault(key, {}), value)
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+class RunMetrics:
+    """
+    Wall and CPU time per named stage of one command, with the counters the
+    stage reports (rows, cache hits, HTTP statuses, ...) summed over calls
+    """
+
+    def __init__(self, command: str = ''):
+        self.command = command
+        self.created = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.stages: Dict[str, Dict] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict]:
+        """Time a block; counters added to the yielded dict are stored with the stage"""
+        record = {}
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            totals = self.stages.setdefault(name, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+            record.update(calls=1, wall_s=time.perf_counter() - wall, cpu_s=time.process_time() - cpu)
+            _merge(totals, record)
+            totals['peak_rss_mb'] = peak_rss_mb()
+
+    def to_dict(self) -> Dict:
+        stages = {}
+        for name, totals in self.stages.items():
+            stage = {key: round(value, 4) if isinstance(value, float) else value for key, value in totals.items()}
+            if 'rows' in totals and totals['wall_s'] > 0:
+                stage['rows_per_s'] = round(totals['rows'] / totals['wall_s'], 1)
+            stages[name] = stage
+        return {
+            'command': self.command,
+            'created': self.created,
+            'wall_s': round(time.perf_counter() - self.started, 4),
+            'cpu_s': round(time.process_time() - self.cpu_started, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_rss_children_mb': peak_rss_mb(children=True),
+            'stages': stages
+        }
+
+    def write(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self) -> str:
+        data = self.to_dict()
+        lines = [f"{'stage':<20} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'rows':>9} {'rows/s':>10}"]
+        for name, stage in data['stages'].items():
+            lines.append(f"{name:<20} {stage['calls']:>6} {stage['wall_s']:>9.3f} {stage['cpu_s']:>9.3f} "
+                         f"{stage.get('rows', ''):>9} {stage.get('rows_per_s', ''):>10}")
+        lines.append(f"total: {data['wall_s']:.3f}s wall, {data['cpu_s']:.3f}s CPU, "
+                     f"peak RSS {data['peak_rss_mb']} MB")
+        return '\n'.join(lines)
+
+_active: Optional[RunMetrics] = None
+
+def start(command: str = '') -> RunMetrics:
+    """Start recording; stage() blocks are timed until stop()"""
+    global _active
+    _active = RunMetrics(command)
+    return _active
+
+def stop() -> Optional[RunMetrics]:
+    global _active
+    metrics, _active = _active, None
+    return metrics
+
+def active() -> Optional[RunMetrics]:
+    return _active
+
+@contextmanager
+def stage(name: str) -> Iterator[Dict]:
+    """Time a block into the active recorder; without one the block just runs"""
+    if _active is None:
+        yield {}
+        return
+    with _active.stage(name) as record:
+        yield record
@@ -1,8 +1,16 @@
 from .base import SentimentModel
-from .vader_model import VaderModel
-from .logreg_model import LogRegModel
 from .model_factory import get_model
 
 SUPPORTED_MODELS = ['vader', 'logreg']
 
+def __getattr__(name):
+    # Load model classes lazily; LogRegModel pulls in scikit-learn
+    if name == 'VaderModel':
+        from .vader_model import VaderModel
+        return VaderModel
+    if name == 'LogRegModel':
+        from .logreg_model import LogRegModel
+        return LogRegModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = ['SentimentModel', 'VaderModel', 'LogRegModel', 'get_model']
\ No newline at end of file
@@ -1,7 +1,30 @@
 # models/base.py
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 class SentimentModel(ABC):
+    score_keys: Tuple[str, ...] = ()
+
     @abstractmethod
     def analyze(self, text: str) -> dict:
-        pass
\ No newline at end of file
+        pass
+
+    def artifact_hash(self) -> str:
+        """Identify the model artifacts, so cached scores are invalidated when they change"""
+        return type(self).__name__
+
+    def analyze_batch(self, texts: Sequence[str]) -> Dict[str, 'np.ndarray']:
+        """
+        Analyze a batch of texts and return one score array per key
+        Returns: {key: np.ndarray} for every key in score_keys
+        """
+        import numpy as np
+
+        sentiments = [self.analyze(text) for text in texts]
+        return {
+            key: np.fromiter((s[key] for s in sentiments), dtype=np.float64, count=len(sentiments))
+            for key in self.score_keys
+        }
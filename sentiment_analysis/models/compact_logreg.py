@@ -0,0 +1,150 @@
+# models/compact_logreg.py
+import json
+import os
+import re
+from typing import Sequence, Tuple
+
+import numpy as np
+
+COMPACT_FILES = ('vocabulary.npy', 'columns.npy', 'idf.npy', 'coef.npy')
+
+def export_compact(vectorizer, model, out_dir: str, artifact_hash: str = '', vectorizer_hash: str = ''):
+    """
+    Write a fitted TfidfVectorizer + binary LogisticRegression as plain .npy
+    arrays: the vocabulary sorted as a fixed-width string array with the
+    column of each term, the IDF vector and the coefficient vector.
+    """
+    if not hasattr(vectorizer, 'vocabulary_'):
+        raise ValueError("Only TfidfVectorizer models can be exported; hashed features have no vocabulary")
+    params = vectorizer.get_params()
+    if (params['analyzer'] != 'word' or params['tokenizer'] or params['preprocessor']
+            or params['stop_words'] or params['strip_accents'] or params['binary']
+            or params['norm'] not in ('l2', None)):
+        raise ValueError("Only word n-gram vectorizers without custom hooks can be exported")
+    if model.coef_.shape[0] != 1:
+        raise ValueError("Only binary logistic regression models can be exported")
+
+    terms = np.array(list(vectorizer.vocabulary_), dtype=str)
+    columns = np.array(list(vectorizer.vocabulary_.values()), dtype=np.int32)
+    order = np.argsort(terms, kind='stable')
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, 'vocabulary.npy'), terms[order])
+    np.save(os.path.join(out_dir, 'columns.npy'), columns[order])
+    np.save(os.path.join(out_dir, 'idf.npy'), np.asarray(vectorizer.idf_, dtype=np.float64))
+    np.save(os.path.join(out_dir, 'coef.npy'), np.ascontiguousarray(model.coef_[0], dtype=np.float64))
+    meta = {
+        'token_pattern': params['token_pattern'],
+        'ngram_range': list(params['ngram_range']),
+        'lowercase': params['lowercase'],
+        'norm': params['norm'],
+        'sublinear_tf': params['sublinear_tf'],
+        'use_idf': params['use_idf'],
+        'intercept': float(model.intercept_[0]),
+        'artifact_hash': artifact_hash,
+        'vectorizer_hash': vectorizer_hash
+    }
+    with open(os.path.join(out_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+def _row_sums(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Per-row sums added left to right, the order scipy/sklearn use for CSR rows"""
+    sums = np.zeros(len(starts), dtype=np.float64)
+    for k in range(int(lengths.max(initial=0))):
+        rows = np.flatnonzero(lengths > k)
+        sums[rows] += values[starts[rows] + k]
+    return sums
+
+class CompactLogReg:
+    """
+    TF-IDF + logistic regression scoring from memory-mapped arrays. Processes
+    that load the same directory share its pages, and the probabilities are
+    bit-for-bit those of the sklearn pipeline it was exported from.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.vocabulary, self.columns, self.idf, self.coef = (
+            np.load(os.path.join(path, name), mmap_mode='r') for name in COMPACT_FILES
+        )
+        self.intercept = self.meta['intercept']
+        self.token_pattern = re.compile(self.meta['token_pattern'])
+        self.min_n, self.max_n = self.meta['ngram_range']
+        self.max_term_length = self.vocabulary.dtype.itemsize // 4
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return all(os.path.exists(os.path.join(path, name)) for name in (*COMPACT_FILES, 'meta.json'))
+
+    def _ngrams(self, text: str) -> list:
+        """The word n-grams TfidfVectorizer's analyzer produces for a text"""
+        if self.meta['lowercase']:
+            text = text.lower()
+        tokens = self.token_pattern.findall(text)
+        grams = list(tokens) if self.min_n == 1 else []
+        for n in range(max(self.min_n, 2), self.max_n + 1):
+            if n == 2:
+                grams += [a + ' ' + b for a, b in zip(tokens, tokens[1:])]
+            else:
+                grams += [' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+        return grams
+
+    def _term_matrix(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Term counts in CSR order: row starts, columns sorted per row, counts and the row of each entry"""
+        grams, lengths = [], []
+        for text in texts:
+            text_grams = self._ngrams(text)
+            grams.extend(text_grams)
+            lengths.append(len(text_grams))
+        rows = np.repeat(np.arange(len(texts)), lengths)
+
+        # One character wider than the longest term: a truncated n-gram can never match
+        candidates = np.array(grams, dtype=f'<U{self.max_term_length + 1}')
+        positions = np.searchsorted(self.vocabulary, candidates)
+        positions[positions == len(self.vocabulary)] = 0
+        found = self.vocabulary[positions] == candidates
+
+        keys = rows[found] * len(self.idf) + self.columns[positions[found]]
+        keys, counts = np.unique(keys, return_counts=True)
+        row_of_entry = keys // len(self.idf)
+        starts = np.searchsorted(row_of_entry, np.arange(len(texts)))
+        return starts, keys % len(self.idf), counts.astype(np.float64), row_of_entry
+
+    def _weighted_terms(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """TF-IDF weights in CSR order: row starts, columns, weights, the row of each entry and row lengths"""
+        starts, columns, data, row_of_entry = self._term_matrix(texts)
+        lengths = np.bincount(row_of_entry, minlength=len(texts))
+
+        if self.meta['sublinear_tf']:
+            data = np.log(data) + 1.0
+        if self.meta['use_idf']:
+            data = data * self.idf[columns]
+        if self.meta['norm'] == 'l2':
+            norms = np.sqrt(_row_sums(data * data, starts, lengths))
+            norms[norms == 0.0] = 1.0
+            data = data / norms[row_of_entry]
+        return starts, columns, data, row_of_entry, lengths
+
+    def transform(self, texts: Sequence[str]):
+        """The TF-IDF matrix of the texts, equal to the exported vectorizer's transform"""
+        from scipy.sparse import csr_matrix
+
+        starts, columns, data, _, _ = self._weighted_terms(texts)
+        indptr = np.append(starts, len(data)).astype(np.int32)
+        return csr_matrix((data, columns.astype(np.int32), indptr), shape=(len(texts), len(self.idf)))
+
+    def predict_pos(self, texts: Sequence[str]) -> np.ndarray:
+        """Probability of the positive class for each text"""
+        from scipy.special import expit
+
+        starts, columns, data, _, lengths = self._weighted_terms(texts)
+        decision = _row_sums(data * self.coef[columns], starts, lengths) + self.intercept
+        return expit(decision)
+
+    def predict_pos_matrix(self, matrix) -> np.ndarray:
+        """Probability of the positive class for each row of a TF-IDF matrix"""
+        from scipy.special import expit
+
+        return expit(matrix @ np.asarray(self.coef) + self.intercept)
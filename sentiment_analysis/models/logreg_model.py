@@ -1,22 +1,54 @@
 # models/logreg_model.py
+import hashlib
 import os
-import joblib
-from sklearn.linear_model import LogisticRegression
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import Dict, Sequence
+
+import numpy as np
 
 from .base import SentimentModel
+from .compact_logreg import CompactLogReg, export_compact
+
+def _file_digest(*paths: str) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
 
 class LogRegModel(SentimentModel):
-    def __init__(self):
+    score_keys = ('neg', 'pos', 'compound')
+
+    def __init__(self, use_compact: bool = True, model_dir: str = 'assets/models'):
         self.model = None
         self.vectorizer = None
+        self.model_path = os.path.join(model_dir, 'sentiment_model.joblib')
+        self.vectorizer_path = os.path.join(model_dir, 'tfidf_vectorizer.joblib')
+        self.compact_path = os.path.join(model_dir, 'logreg_compact')
+        self.compact = None
+        self.use_compact = use_compact
+        self._artifact_hash = None
+        self._vectorizer_hash = None
         self.load_model()
     
     def load_model(self):
-        """Load and verify model and vectorizer"""
+        """Load the compact export if it matches the joblib artifacts, else the joblib model and vectorizer"""
+        if self.use_compact and CompactLogReg.exists(self.compact_path):
+            compact = CompactLogReg(self.compact_path)
+            joblib_present = os.path.exists(self.model_path) and os.path.exists(self.vectorizer_path)
+            if not joblib_present or compact.meta['artifact_hash'] == self.artifact_hash():
+                self.compact = compact
+                self._artifact_hash = compact.meta['artifact_hash']
+                self._vectorizer_hash = compact.meta.get('vectorizer_hash') or None
+                return
+            print(f"Ignoring stale compact model in {self.compact_path}; re-run senti export-model")
+
+        import joblib
+        from sklearn.linear_model import LogisticRegression, SGDClassifier
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+
         try:
-            model_path = 'assets/models/sentiment_model.joblib'
-            vectorizer_path = 'assets/models/tfidf_vectorizer.joblib'
+            model_path = self.model_path
+            vectorizer_path = self.vectorizer_path
             
             if not os.path.exists(model_path) or not os.path.exists(vectorizer_path):
                 raise FileNotFoundError("Model or vectorizer file not found")
@@ -24,34 +56,97 @@ class LogRegModel(SentimentModel):
             self.model = joblib.load(model_path)
             self.vectorizer = joblib.load(vectorizer_path)
             
-            if not isinstance(self.model, LogisticRegression):
-                raise TypeError("Loaded model is not a LogisticRegression model")
-            if not isinstance(self.vectorizer, TfidfVectorizer):
-                raise TypeError("Loaded vectorizer is not a TfidfVectorizer")
+            # SGDClassifier and HashingVectorizer are what senti train writes
+            if not isinstance(self.model, (LogisticRegression, SGDClassifier)) or not hasattr(self.model, 'predict_proba'):
+                raise TypeError("Loaded model is not a logistic regression model")
+            if not isinstance(self.vectorizer, (TfidfVectorizer, HashingVectorizer)):
+                raise TypeError("Loaded vectorizer is not a TfidfVectorizer or HashingVectorizer")
                 
         except Exception as e:
             raise RuntimeError(f"Error loading model: {str(e)}")
+
+    def export_compact(self, out_dir: str = None) -> str:
+        """Write the memory-mappable export of the joblib model and vectorizer"""
+        if self.model is None:
+            raise RuntimeError("The compact export is built from the joblib model; load it with use_compact=False")
+        out_dir = out_dir or self.compact_path
+        export_compact(self.vectorizer, self.model, out_dir, self.artifact_hash(), self.vectorizer_hash())
+        return out_dir
+
+    def artifact_hash(self) -> str:
+        """SHA-256 over the model and vectorizer files"""
+        if self._artifact_hash is None:
+            self._artifact_hash = _file_digest(self.model_path, self.vectorizer_path)
+        return self._artifact_hash
+
+    def vectorizer_hash(self) -> str:
+        """SHA-256 of the vectorizer file; stored TF-IDF matrices are keyed by it"""
+        if self._vectorizer_hash is None:
+            if not os.path.exists(self.vectorizer_path):
+                raise RuntimeError("The compact export predates feature matrices; re-run senti export-model")
+            self._vectorizer_hash = _file_digest(self.vectorizer_path)
+        return self._vectorizer_hash
+
+    def transform(self, texts: Sequence[str]):
+        """TF-IDF matrix of the texts, one CSR row per text"""
+        if self.compact is not None:
+            return self.compact.transform(texts)
+        return self.vectorizer.transform(texts)
     
     def analyze(self, text: str) -> dict:
         """
         Analyze text and return vaderSentiment-like sentiment scores
         Returns: {'neg': float, 'pos': float, 'compound': float}
         """
-        if not self.model or not self.vectorizer:
+        scores = self.analyze_batch([text])
+        return {key: round(float(scores[key][0]), 3) for key in self.score_keys}
+
+    def analyze_batch(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Analyze a batch of texts with a single vectorizer/model call
+        Returns: {'neg': np.ndarray, 'pos': np.ndarray, 'compound': np.ndarray}
+        """
+        if self.compact is None and (not self.model or not self.vectorizer):
             raise RuntimeError("Model not properly initialized")
-            
-        text_vector = self.vectorizer.transform([text])
-        
-        proba = self.model.predict_proba(text_vector)[0]
-        neg = proba[0]
-        pos = proba[1]
-        
-        compound = pos - neg
+
+        if len(texts) == 0:
+            return {key: np.empty(0, dtype=np.float64) for key in self.score_keys}
+
+        if self.compact is not None:
+            pos = self.compact.predict_pos(texts)
+            neg = 1 - pos
+        else:
+            text_matrix = self.vectorizer.transform(texts)
+            proba = self.model.predict_proba(text_matrix)
+            neg = proba[:, 0]
+            pos = proba[:, 1]
+
+        return {
+            'neg': neg,
+            'pos': pos,
+            'compound': pos - neg
+        }
+
+    def analyze_matrix(self, matrix) -> Dict[str, np.ndarray]:
+        """
+        Score the rows of a TF-IDF matrix from transform, skipping tokenization
+        Returns: {'neg': np.ndarray, 'pos': np.ndarray, 'compound': np.ndarray}
+        """
+        if matrix.shape[0] == 0:
+            return {key: np.empty(0, dtype=np.float64) for key in self.score_keys}
+
+        if self.compact is not None:
+            pos = self.compact.predict_pos_matrix(matrix)
+            neg = 1 - pos
+        else:
+            proba = self.model.predict_proba(matrix)
+            neg = proba[:, 0]
+            pos = proba[:, 1]
 
         return {
-            'neg': round(neg, 3),
-            'pos': round(pos, 3),
-            'compound': round(compound, 3)
+            'neg': neg,
+            'pos': pos,
+            'compound': pos - neg
         }
 
 if __name__ == '__main__':
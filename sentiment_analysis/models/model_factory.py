@@ -1,10 +1,15 @@
 # models/model_factory.py
-from sentiment_analysis.models import VaderModel, LogRegModel
+from importlib import import_module
+
 from sentiment_analysis.models.base import SentimentModel
 
-def get_model(model_name: str) -> SentimentModel:
-    models = {
-        'vader': VaderModel,
-        'logreg': LogRegModel
-    }
-    return models[model_name]()
\ No newline at end of file
+# Model modules are imported on first use, so VADER never loads scikit-learn
+MODELS = {
+    'vader': ('sentiment_analysis.models.vader_model', 'VaderModel'),
+    'logreg': ('sentiment_analysis.models.logreg_model', 'LogRegModel')
+}
+
+def get_model(model_name: str, **options) -> SentimentModel:
+    """Instantiate a model by name; options go to its constructor, e.g. model_dir for logreg"""
+    module, name = MODELS[model_name]
+    return getattr(import_module(module), name)(**options)
\ No newline at end of file
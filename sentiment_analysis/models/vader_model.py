@@ -1,13 +1,23 @@
 # models/vader_model.py
+from importlib.metadata import version, PackageNotFoundError
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from .base import SentimentModel
 
 class VaderModel(SentimentModel):
+    score_keys = ('neg', 'neu', 'pos', 'compound')
+
     def __init__(self):
         self.analyzer = SentimentIntensityAnalyzer()
     
     def analyze(self, text: str) -> dict:
         return self.analyzer.polarity_scores(text)
+
+    def artifact_hash(self) -> str:
+        """VADER's lexicon ships with the package, so its version identifies the model"""
+        try:
+            return f"vaderSentiment-{version('vaderSentiment')}"
+        except PackageNotFoundError:
+            return super().artifact_hash()
     
 if __name__ == '__main__':
     text = 'I love the weather today'
@@ -1,9 +1,16 @@
 # scraper/__init__.py
 from .scraper import async_scrape_reviews
-from .db import load_reviews, save_reviews
+from .db import (load_reviews, load_reviews_frame, save_reviews, append_reviews,
+                 count_reviews, last_seen, known_reviews, migrate_to_parquet)
 
 __all__ = [
     "async_scrape_reviews",
     "load_reviews", 
-    "save_reviews"
+    "load_reviews_frame",
+    "save_reviews",
+    "append_reviews",
+    "count_reviews",
+    "last_seen",
+    "known_reviews",
+    "migrate_to_parquet"
 ]
\ No newline at end of file
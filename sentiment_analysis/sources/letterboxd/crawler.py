@@ -0,0 +1,191 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .model import Review
+
+@dataclass
+class PageResult:
+    """Outcome of fetching and parsing one review page"""
+    status: int
+    reviews: List[Review] = field(default_factory=list)
+    last_page: Optional[int] = None
+    retry_after: Optional[float] = None
+
+@dataclass
+class CrawlStats:
+    pages: int = 0
+    reviews: int = 0
+    retries: int = 0
+    errors: int = 0
+    status_counts: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+    final_concurrency: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        statuses = ', '.join(f"{status}: {count}" for status, count in sorted(self.status_counts.items()))
+        return (f"{self.pages} pages in {self.elapsed:.2f}s ({self.pages_per_second:.2f} pages/s), "
+                f"{self.retries} retries, {self.errors} errors, "
+                f"concurrency {self.final_concurrency:.1f} [{statuses}]")
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit: grow by one slot per window of fast, successful
+    responses and halve on 429/5xx or network errors.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 32,
+                 target_latency: float = 2.0):
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency: Optional[float] = None, congested: bool = False):
+        """Free a slot and adapt the limit; without a latency the slot was not used"""
+        async with self._condition:
+            self.in_flight -= 1
+            if latency is None:
+                pass
+            elif congested:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif latency > self.target_latency:
+                self.limit = max(self.minimum, self.limit * 0.8)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+class PageCrawler:
+    """
+    Crawl numbered pages with a bounded work queue and long-lived workers.
+    Pages are handed out in order as workers free up, failed pages are retried
+    with jittered exponential backoff, and the crawl stops at the last page,
+    taken from the pagination when available or from the first empty page.
+    Crawlers of several movies can share one limiter as a global request
+    budget; workers then caps how many of its slots one movie can hold.
+    on_page is awaited with the reviews of each page in page order, as soon
+    as that page and all pages before it are done; pages past the end are
+    never passed on. end_page stops the crawl there even if more pages exist.
+    """
+
+    def __init__(self, fetch_page: Callable[[int], Awaitable[PageResult]], start_page: int = 1,
+                 concurrency: int = 5, max_concurrency: int = 32, max_retries: int = 3,
+                 backoff: float = 0.5, stats: Optional[CrawlStats] = None,
+                 limiter: Optional[AdaptiveLimiter] = None, workers: Optional[int] = None,
+                 on_page: Optional[Callable[[int, List[Review]], Awaitable[None]]] = None,
+                 end_page: Optional[int] = None):
+        self.fetch_page = fetch_page
+        self.start_page = start_page
+        self.limiter = limiter or AdaptiveLimiter(concurrency, maximum=max(concurrency, max_concurrency))
+        self.workers = workers or max(concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.last_page = end_page if end_page is not None else float('inf')
+        self.results: Dict[int, List[Review]] = {}
+        self.on_page = on_page
+        self._done: Dict[int, List[Review]] = {}
+        self._next_page = start_page
+        self._emit_lock = asyncio.Lock()
+        self.stats = stats if stats is not None else CrawlStats()
+
+    @staticmethod
+    def is_retryable(status: int) -> bool:
+        return status == 429 or status >= 500 or status == 0
+
+    def _delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return retry_after
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def _fetch_with_retry(self, page: int) -> Optional[PageResult]:
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            if page > self.last_page:
+                # The end was found while this page waited for a slot
+                await self.limiter.release()
+                return None
+            started = time.perf_counter()
+            try:
+                result = await self.fetch_page(page)
+            except Exception as e:
+                print(f"Error fetching page {page}: {e}")
+                result = PageResult(status=0)
+            finally:
+                latency = time.perf_counter() - started
+            await self.limiter.release(latency, self.is_retryable(result.status))
+
+            self.stats.status_counts[result.status] += 1
+            if not self.is_retryable(result.status) or attempt == self.max_retries:
+                return result
+            self.stats.retries += 1
+            await asyncio.sleep(self._delay(attempt, result.retry_after))
+        return result
+
+    def _finish(self, page: int, result: PageResult):
+        if result.last_page is not None:
+            self.last_page = min(self.last_page, result.last_page)
+        if result.status == 200 and result.reviews:
+            self.results[page] = result.reviews
+            self.stats.pages += 1
+            self.stats.reviews += len(result.reviews)
+            return
+        if result.status not in (200, 404):
+            self.stats.errors += 1
+        # An empty or missing page marks the end of the list. A page that keeps
+        # failing ends it too, so the stored reviews stay a gap-free prefix.
+        self.last_page = min(self.last_page, page - 1)
+
+    async def _emit(self, page: int):
+        """Pass finished pages on in order, stopping at the first page that is not done"""
+        self._done[page] = self.results.get(page, [])
+        async with self._emit_lock:
+            while self._next_page in self._done and self._next_page <= self.last_page:
+                reviews = self._done.pop(self._next_page)
+                if reviews:
+                    await self.on_page(self._next_page, reviews)
+                self._next_page += 1
+
+    async def _produce(self, queue: asyncio.Queue):
+        page = self.start_page
+        while page <= self.last_page:
+            await queue.put(page)
+            page += 1
+        for _ in range(self.workers):
+            await queue.put(None)
+
+    async def _work(self, queue: asyncio.Queue):
+        while True:
+            page = await queue.get()
+            if page is None:
+                return
+            if page > self.last_page:
+                continue
+            result = await self._fetch_with_retry(page)
+            if result is not None:
+                self._finish(page, result)
+                if self.on_page is not None:
+                    await self._emit(page)
+
+    async def run(self) -> Dict[int, List[Review]]:
+        """Crawl until the last page and return the reviews of each page"""
+        started = time.perf_counter()
+        queue = asyncio.Queue(maxsize=self.workers)
+        await asyncio.gather(self._produce(queue), *(self._work(queue) for _ in range(self.workers)))
+        self.stats.elapsed = time.perf_counter() - started
+        self.stats.final_concurrency = self.limiter.limit
+        # Drop pages that were already in flight when the end was found
+        return {page: reviews for page, reviews in self.results.items() if page <= self.last_page}
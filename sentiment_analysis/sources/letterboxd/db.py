@@ -1,18 +1,116 @@
 import csv
+import glob
+import hashlib
 import os
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
 
 from .model import Review
+from ...storage import get_backend
 
 BASE_PATH = 'out/db/letterboxd/raw/'
+SQLITE_PATH = 'out/db/letterboxd/reviews.sqlite'
+REVIEW_COLUMNS = ('username', 'score', 'review', 'date')
+REVIEW_FORMATS = ('csv', 'parquet', 'sqlite')
+
+ReviewKey = Tuple[str, str, str]
+
+def review_path(movie_name: str, fmt: str = 'csv') -> str:
+    """Path of a movie's raw review file in the given storage format"""
+    if fmt not in REVIEW_FORMATS:
+        raise ValueError(f"Unsupported storage format: {fmt} (expected one of {', '.join(REVIEW_FORMATS)})")
+    if fmt == 'sqlite':
+        return SQLITE_PATH
+    return f'{BASE_PATH}{movie_name}.{fmt}'
+
+def _connect() -> sqlite3.Connection:
+    """Open the review database, creating the indexed table on first use"""
+    os.makedirs(os.path.dirname(SQLITE_PATH), exist_ok=True)
+    conn = sqlite3.connect(SQLITE_PATH)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reviews (
+            id INTEGER PRIMARY KEY,
+            movie TEXT NOT NULL,
+            username TEXT NOT NULL,
+            date TEXT NOT NULL,
+            review_hash TEXT NOT NULL,
+            score REAL,
+            review TEXT NOT NULL,
+            UNIQUE (movie, username, date, review_hash)
+        )
+    """)
+    return conn
+
+def _sqlite_has_movie(movie_name: str) -> bool:
+    if not os.path.exists(SQLITE_PATH):
+        return False
+    with closing(_connect()) as conn:
+        return conn.execute('SELECT 1 FROM reviews WHERE movie = ? LIMIT 1', (movie_name,)).fetchone() is not None
+
+def stored_format(movie_name: str) -> Optional[str]:
+    """Format of the stored reviews for a movie, preferring the newest file if several exist"""
+    existing = [(os.path.getmtime(review_path(movie_name, fmt)), fmt)
+                for fmt in ('csv', 'parquet') if os.path.exists(review_path(movie_name, fmt))]
+    if existing:
+        return max(existing)[1]
+    return 'sqlite' if _sqlite_has_movie(movie_name) else None
+
+def review_key(username, review_date, text) -> ReviewKey:
+    """Identity of a review: (username, ISO date, hash of the review text)"""
+    if isinstance(review_date, date):
+        review_date = review_date.isoformat()
+    elif review_date is None or pd.isna(review_date):
+        review_date = ''
+    text_hash = hashlib.blake2b(str(text).encode('utf-8'), digest_size=8).hexdigest()
+    return str(username), str(review_date), text_hash
+
+def _fingerprint(key: ReviewKey) -> int:
+    return int.from_bytes(hashlib.blake2b('\x1f'.join(key).encode('utf-8'), digest_size=8).digest(), 'little')
+
+class KnownReviews:
+    """Sorted 64-bit fingerprints of review keys: a compact, read-only set of 8 bytes per review"""
 
-def load_reviews(movie_name: str) -> list[Review]:
-    """Load reviews from a CSV file"""
-    csv_file_path = f'{BASE_PATH}{movie_name}.csv'
-    if not os.path.exists(csv_file_path):
+    def __init__(self, keys: Iterable[ReviewKey] = ()):
+        self.fingerprints = np.unique(np.fromiter((_fingerprint(key) for key in keys), dtype=np.uint64))
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def __contains__(self, key: ReviewKey) -> bool:
+        fingerprint = np.uint64(_fingerprint(key))
+        i = np.searchsorted(self.fingerprints, fingerprint)
+        return bool(i < len(self.fingerprints) and self.fingerprints[i] == fingerprint)
+
+    def knows(self, review: Review) -> bool:
+        return review_key(review.username, review.date, review.review) in self
+
+def load_reviews(movie_name: str, fmt: Optional[str] = None) -> list[Review]:
+    """Load reviews from the movie's CSV or Parquet file, or the review database"""
+    fmt = fmt or stored_format(movie_name)
+    if fmt is None or not os.path.exists(review_path(movie_name, fmt)):
         return []
 
+    if fmt == 'sqlite':
+        with closing(_connect()) as conn:
+            rows = conn.execute(
+                'SELECT username, score, review, date FROM reviews WHERE movie = ? ORDER BY id', (movie_name,)
+            ).fetchall()
+        return [Review(username=u, score=score, review=r, date=d or None) for u, score, r, d in rows]
+
+    if fmt != 'csv':
+        df = load_reviews_frame(movie_name, fmt=fmt)
+        return [
+            Review(username=row.username, score=float(row.score), review=row.review, date=row.date)
+            for row in df.itertuples(index=False)
+        ]
+
     reviews = []
-    with open(csv_file_path, 'r', newline='', encoding='utf-8') as csvfile:
+    with open(review_path(movie_name, fmt), 'r', newline='', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
             review = Review(
@@ -24,14 +122,181 @@ def load_reviews(movie_name: str) -> list[Review]:
             reviews.append(review)
     return reviews
 
-def save_reviews(data: list[Review], movie_name: str):
-    """Save reviews to a CSV file"""
-    csv_file_path = f'{BASE_PATH}{movie_name}.csv'
-    os.makedirs(os.path.dirname(csv_file_path), exist_ok=True)
-    keys = data[0].__annotations__.keys() if data else []
-    with open(csv_file_path, 'w', newline='', encoding='utf-8') as csvfile:
+def load_reviews_frame(movie_name: str, columns: Optional[Sequence[str]] = None,
+                       fmt: Optional[str] = None) -> pd.DataFrame:
+    """Load reviews as a DataFrame, reading only the requested columns"""
+    fmt = fmt or stored_format(movie_name) or 'csv'
+    if fmt == 'sqlite':
+        columns = [c for c in (columns or REVIEW_COLUMNS) if c in REVIEW_COLUMNS]
+        with closing(_connect()) as conn:
+            return pd.read_sql_query(
+                f'SELECT {", ".join(columns)} FROM reviews WHERE movie = ? ORDER BY id',
+                conn, params=(movie_name,)
+            )
+    return get_backend(fmt).read(review_path(movie_name, fmt), columns=columns)
+
+def _as_date(value) -> Optional[date]:
+    """Dates come back from CSV as ISO strings; store them as real dates"""
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+def reviews_to_frame(data: List[Review]) -> pd.DataFrame:
+    """Convert reviews to a DataFrame with typed columns"""
+    return pd.DataFrame({
+        'username': pd.Series([r.username for r in data], dtype='string'),
+        'score': pd.Series([r.score for r in data], dtype='float64'),
+        'review': pd.Series([r.review for r in data], dtype='string'),
+        'date': pd.Series([_as_date(r.date) for r in data], dtype='object')
+    })
+
+def _sqlite_rows(data: List[Review], movie_name: str) -> list[tuple]:
+    rows = []
+    for r in data:
+        username, review_date, text_hash = review_key(r.username, r.date, r.review)
+        rows.append((movie_name, username, review_date, text_hash, r.score, r.review))
+    return rows
+
+def _insert_sqlite(conn: sqlite3.Connection, data: List[Review], movie_name: str) -> int:
+    cursor = conn.executemany(
+        'INSERT OR IGNORE INTO reviews (movie, username, date, review_hash, score, review) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        _sqlite_rows(data, movie_name)
+    )
+    return cursor.rowcount
+
+def _has_content(path: str) -> bool:
+    """Whether a review file holds more than whitespace; empty scrapes used to leave a bare line break"""
+    with open(path, 'rb') as f:
+        return bool(f.read(64).strip())
+
+def save_reviews(data: list[Review], movie_name: str, fmt: str = 'csv'):
+    """Save reviews to a CSV or Parquet file, or the review database"""
+    file_path = review_path(movie_name, fmt)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    if fmt == 'sqlite':
+        with closing(_connect()) as conn, conn:
+            conn.execute('DELETE FROM reviews WHERE movie = ?', (movie_name,))
+            _insert_sqlite(conn, data, movie_name)
+        print(f"Data saved to {file_path}")
+        return
+
+    if fmt != 'csv':
+        get_backend(fmt).write(reviews_to_frame(data), file_path)
+        print(f"Data saved to {file_path}")
+        return
+
+    # The header is written even without reviews, so the file can still be read and appended to
+    keys = REVIEW_COLUMNS
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=keys)
         writer.writeheader()
         for review in data:
             writer.writerow({key: getattr(review, key) for key in keys})
-    print(f"Data saved to {csv_file_path}")
\ No newline at end of file
+    print(f"Data saved to {file_path}")
+
+def stored_keys(movie_name: str, fmt: Optional[str] = None) -> Set[ReviewKey]:
+    """Identity keys of all stored reviews, read without building Review objects"""
+    fmt = fmt or stored_format(movie_name)
+    if fmt is None or not os.path.exists(review_path(movie_name, fmt)):
+        return set()
+
+    if fmt == 'sqlite':
+        with closing(_connect()) as conn:
+            return set(conn.execute(
+                'SELECT username, date, review_hash FROM reviews WHERE movie = ?', (movie_name,)
+            ))
+
+    if fmt == 'csv':
+        with open(review_path(movie_name, fmt), 'r', newline='', encoding='utf-8') as csvfile:
+            return {review_key(row['username'], row['date'], row['review'])
+                    for row in csv.DictReader(csvfile)}
+
+    df = load_reviews_frame(movie_name, ['username', 'date', 'review'], fmt)
+    return {review_key(*row) for row in df.itertuples(index=False)}
+
+def known_reviews(movie_name: str, fmt: Optional[str] = None) -> KnownReviews:
+    """Fingerprints of all stored reviews of a movie, for incremental syncs"""
+    return KnownReviews(stored_keys(movie_name, fmt))
+
+def append_reviews(data: list[Review], movie_name: str, fmt: str = 'csv') -> int:
+    """
+    Add reviews that are not stored yet, keyed on (username, date, review hash).
+    CSV files are appended to and the database is inserted into; Parquet files
+    cannot be appended in place and are rewritten. Returns the number of new rows.
+    """
+    file_path = review_path(movie_name, fmt)
+    if fmt == 'sqlite':
+        with closing(_connect()) as conn, conn:
+            written = _insert_sqlite(conn, data, movie_name)
+        print(f"Added {written} reviews to {file_path}")
+        return written
+
+    exists = os.path.exists(file_path) and _has_content(file_path)
+    known = stored_keys(movie_name, fmt) if exists else set()
+    new_reviews = []
+    for review in data:
+        key = review_key(review.username, review.date, review.review)
+        if key not in known:
+            known.add(key)
+            new_reviews.append(review)
+
+    if not exists:
+        save_reviews(new_reviews, movie_name, fmt)
+    elif new_reviews and fmt == 'csv':
+        keys = REVIEW_COLUMNS
+        with open(file_path, 'a', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=keys)
+            for review in new_reviews:
+                writer.writerow({key: getattr(review, key) for key in keys})
+        print(f"Added {len(new_reviews)} reviews to {file_path}")
+    elif new_reviews:
+        save_reviews(load_reviews(movie_name, fmt) + new_reviews, movie_name, fmt)
+    return len(new_reviews)
+
+def count_reviews(movie_name: str, fmt: Optional[str] = None) -> int:
+    """Number of stored reviews for a movie without loading them"""
+    fmt = fmt or stored_format(movie_name)
+    if fmt is None or not os.path.exists(review_path(movie_name, fmt)):
+        return 0
+    if fmt == 'sqlite':
+        with closing(_connect()) as conn:
+            return conn.execute('SELECT COUNT(*) FROM reviews WHERE movie = ?', (movie_name,)).fetchone()[0]
+    if not _has_content(review_path(movie_name, fmt)):
+        return 0
+    return get_backend(fmt).count(review_path(movie_name, fmt))
+
+def last_seen(movie_name: str, fmt: Optional[str] = None) -> Optional[ReviewKey]:
+    """Key of the most recently stored review for a movie, or None"""
+    fmt = fmt or stored_format(movie_name)
+    if fmt is None or not os.path.exists(review_path(movie_name, fmt)):
+        return None
+    if fmt == 'sqlite':
+        with closing(_connect()) as conn:
+            return conn.execute(
+                'SELECT username, date, review_hash FROM reviews WHERE movie = ? ORDER BY id DESC LIMIT 1',
+                (movie_name,)
+            ).fetchone()
+    if fmt == 'csv':
+        last = None
+        with open(review_path(movie_name, fmt), 'r', newline='', encoding='utf-8') as csvfile:
+            for last in csv.DictReader(csvfile):
+                pass
+        return review_key(last['username'], last['date'], last['review']) if last else None
+    df = load_reviews_frame(movie_name, ['username', 'date', 'review'], fmt)
+    return review_key(*df.iloc[-1]) if len(df) else None
+
+def migrate_to_parquet(remove_csv: bool = False) -> list[str]:
+    """Convert every raw review CSV into a Parquet file next to it"""
+    migrated = []
+    for csv_path in sorted(glob.glob(f'{BASE_PATH}*.csv')):
+        movie_name = os.path.splitext(os.path.basename(csv_path))[0]
+        save_reviews(load_reviews(movie_name, fmt='csv'), movie_name, fmt='parquet')
+        if remove_csv:
+            os.remove(csv_path)
+        migrated.append(review_path(movie_name, 'parquet'))
+    return migrated
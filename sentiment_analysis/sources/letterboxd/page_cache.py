@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional
+
+from .model import Review
+
+@dataclass
+class CachedPage:
+    html: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    reviews: Optional[List[Review]]
+    last_page: Optional[int]
+
+def _encode_reviews(reviews: List[Review]) -> bytes:
+    rows = [[r.username, r.score, r.review, r.date.isoformat() if r.date else None] for r in reviews]
+    return zlib.compress(json.dumps(rows).encode('utf-8'))
+
+def _decode_reviews(blob: bytes) -> List[Review]:
+    return [Review(username, score, review, date.fromisoformat(day) if day else None)
+            for username, score, review, day in json.loads(zlib.decompress(blob))]
+
+class PageCache:
+    """
+    SQLite-backed HTTP cache of review pages keyed by URL. Bodies and parsed
+    reviews are stored zlib-compressed together with the ETag/Last-Modified
+    validators used for conditional requests.
+    """
+
+    def __init__(self, path: str = 'out/cache/pages.sqlite'):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                reviews BLOB,
+                last_page INTEGER,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for a cached URL"""
+        row = self.conn.execute('SELECT etag, last_modified FROM pages WHERE url = ?', (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers['If-None-Match'] = row[0]
+        if row and row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        row = self.conn.execute(
+            'SELECT body, etag, last_modified, reviews, last_page FROM pages WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, reviews, last_page = row
+        return CachedPage(
+            html=zlib.decompress(body).decode('utf-8'),
+            etag=etag,
+            last_modified=last_modified,
+            reviews=_decode_reviews(reviews) if reviews is not None else None,
+            last_page=last_page
+        )
+
+    def put(self, url: str, html: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+            reviews: Optional[List[Review]] = None, last_page: Optional[int] = None):
+        """Store a fetched page and, if given, its parsed reviews"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (url, etag, last_modified, zlib.compress(html.encode('utf-8')),
+             _encode_reviews(reviews) if reviews is not None else None, last_page, time.time())
+        )
+        self.conn.commit()
+
+    def urls(self, prefix: str = '') -> List[str]:
+        """Cached URLs starting with prefix"""
+        rows = self.conn.execute("SELECT url FROM pages WHERE url LIKE ? ESCAPE '\\' ORDER BY url",
+                                 (prefix.replace('%', r'\%').replace('_', r'\_') + '%',))
+        return [row[0] for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Revalidation counters for the current run"""
+        entries = self.conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+        return {'not_modified': self.hits, 'fetched': self.misses, 'entries': entries}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class _ReplayResponse:
+    def __init__(self, status: int, html: str = ''):
+        self.status = status
+        self.headers: Dict[str, str] = {}
+        self._html = html
+
+    async def text(self) -> str:
+        return self._html
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class ReplaySession:
+    """
+    Stand-in for aiohttp.ClientSession that answers GET requests from a
+    PageCache, returning 404 for pages that were never fetched. Lets the
+    scraper run offline against previously crawled pages.
+    """
+
+    def __init__(self, cache: PageCache):
+        self.cache = cache
+
+    def get(self, url: str, **kwargs) -> _ReplayResponse:
+        page = self.cache.get(url)
+        if page is None:
+            return _ReplayResponse(404)
+        return _ReplayResponse(200, page.html)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
@@ -1,56 +1,162 @@
 import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 import time
 
+try:
+    import lxml.html
+except ImportError:  # fall back to BeautifulSoup's html.parser
+    lxml = None
+
+from ... import metrics
 from .model import Review
-from .db import load_reviews, save_reviews
+from .db import count_reviews, append_reviews, known_reviews
+from .crawler import AdaptiveLimiter, CrawlStats, PageCrawler, PageResult
+from .page_cache import PageCache, ReplaySession
 
 BASE_URL = "https://letterboxd.com/film"
 
-async def scrape_single_page(session: aiohttp.ClientSession, url: str, semaphore: asyncio.Semaphore) -> Tuple[List[Review], bool]:
-    """Scrape a single page of reviews"""
+def parse_last_page(soup: BeautifulSoup) -> Optional[int]:
+    """Read the number of the last page from the pagination links, if present"""
+    numbers = [link.text.strip().replace(',', '') for link in soup.select('div.paginate-pages a')]
+    numbers = [int(n) for n in numbers if n.isdigit()]
+    return max(numbers) if numbers else None
+
+def parse_reviews_bs4(html: str) -> Tuple[List[Review], Optional[int]]:
+    """Parse the reviews and the last page number out of a review page with BeautifulSoup"""
+    soup = BeautifulSoup(html, 'html.parser')
+    reviews = []
+    for element in soup.find_all('li', class_='film-detail'):
+        try:
+            avatar_element = element.find('a', class_='avatar')
+            username = avatar_element.get('href', '').strip() if avatar_element else "Unknown"
+            stars = element.find('span', class_='rating')
+            stars = stars.text.strip() if stars else "No rating"
+            comment = element.find('div', class_='body-text').text.strip()
+            date_element = element.find('span', class_='_nobr')
+            date = date_element.text.strip() if date_element else None
+
+            raw_review = {
+                'username': username,
+                'stars': stars,
+                'comment': comment,
+                'date': date
+            }
+            reviews.append(process_review(raw_review))
+        except Exception as e:
+            print(f"Error processing review: {e}")
+            continue
+    return reviews, parse_last_page(soup)
+
+def _has_class(name: str) -> str:
+    """XPath predicate matching one token of the class attribute, like a CSS class selector"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+_REVIEW_XPATH = f".//li[{_has_class('film-detail')}]"
+_AVATAR_XPATH = f".//a[{_has_class('avatar')}]"
+_RATING_XPATH = f".//span[{_has_class('rating')}]"
+_BODY_XPATH = f".//div[{_has_class('body-text')}]"
+_DATE_XPATH = f".//span[{_has_class('_nobr')}]"
+_PAGES_XPATH = f"//div[{_has_class('paginate-pages')}]//a/text()"
+
+def _first(element, xpath: str):
+    found = element.xpath(xpath)
+    return found[0] if found else None
+
+def parse_reviews_lxml(html: str) -> Tuple[List[Review], Optional[int]]:
+    """Parse a review page with lxml, extracting only the film-detail blocks and pagination"""
+    tree = lxml.html.fromstring(html)
+    reviews = []
+    for element in tree.xpath(_REVIEW_XPATH):
+        try:
+            avatar_element = _first(element, _AVATAR_XPATH)
+            username = avatar_element.get('href', '').strip() if avatar_element is not None else "Unknown"
+            stars = _first(element, _RATING_XPATH)
+            stars = stars.text_content().strip() if stars is not None else "No rating"
+            comment = _first(element, _BODY_XPATH).text_content().strip()
+            date_element = _first(element, _DATE_XPATH)
+            date = date_element.text_content().strip() if date_element is not None else None
+
+            raw_review = {
+                'username': username,
+                'stars': stars,
+                'comment': comment,
+                'date': date
+            }
+            reviews.append(process_review(raw_review))
+        except Exception as e:
+            print(f"Error processing review: {e}")
+            continue
+
+    numbers = [text.strip().replace(',', '') for text in tree.xpath(_PAGES_XPATH)]
+    numbers = [int(n) for n in numbers if n.isdigit()]
+    return reviews, max(numbers) if numbers else None
+
+def parse_reviews(html: str) -> Tuple[List[Review], Optional[int]]:
+    """Parse the reviews and the last page number out of a review page"""
+    if lxml is not None:
+        return parse_reviews_lxml(html)
+    return parse_reviews_bs4(html)
+
+def parse_executor(processes: int = 0) -> Executor:
+    """Pool that parses pages off the event loop: a thread by default, or worker processes"""
+    if processes > 0:
+        return ProcessPoolExecutor(max_workers=processes)
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='parse')
+
+def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+    try:
+        return float(response.headers.get('Retry-After', ''))
+    except ValueError:
+        return None
+
+async def fetch_review_page(session: aiohttp.ClientSession, url: str,
+                            executor: Optional[Executor] = None, cache: Optional[PageCache] = None) -> PageResult:
+    """
+    Fetch one page of reviews, reporting the HTTP status. Parsing runs in
+    executor (the loop's default thread pool if None) so other responses
+    keep being read meanwhile. With a cache the request is conditional, and
+    a 304 answer reuses the cached reviews without parsing the page again.
+    """
+    headers = cache.validators(url) if cache is not None else {}
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304 and cache is not None:
+            cached = cache.get(url)
+            if cached is not None and cached.reviews is not None:
+                cache.hits += 1
+                return PageResult(status=200, reviews=cached.reviews, last_page=cached.last_page)
+            # The cached copy vanished or was never parsed; fetch it in full
+            async with session.get(url) as full_response:
+                return await _read_review_page(full_response, url, executor, cache)
+        return await _read_review_page(response, url, executor, cache)
+
+async def _read_review_page(response: aiohttp.ClientResponse, url: str, executor: Optional[Executor],
+                            cache: Optional[PageCache]) -> PageResult:
+    if response.status != 200:
+        return PageResult(status=response.status, retry_after=_retry_after(response))
+    html = await response.text()
+    loop = asyncio.get_running_loop()
+    reviews, last_page = await loop.run_in_executor(executor, parse_reviews, html)
+    if cache is not None:
+        cache.misses += 1
+        cache.put(url, html, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                  reviews, last_page)
+    return PageResult(status=200, reviews=reviews, last_page=last_page)
+
+async def scrape_single_page(session: aiohttp.ClientSession, url: str, semaphore: asyncio.Semaphore,
+                             executor: Optional[Executor] = None, cache: Optional[PageCache] = None
+                             ) -> Tuple[List[Review], bool]:
+    """Scrape a single page of reviews; pass a ReplaySession to scrape from the page cache offline"""
     async with semaphore:
         try:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return [], False
-                    
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                reviews = []
-                review_elements = soup.find_all('li', class_='film-detail')
-                
-                if not review_elements:
-                    return [], False
-                
+            result = await fetch_review_page(session, url, executor, cache)
         except Exception as e:
             print(f"Error fetching {url}: {e}")
             return [], False
-        
-        for element in review_elements:
-            try:
-                avatar_element = element.find('a', class_='avatar')
-                username = avatar_element.get('href', '').strip() if avatar_element else "Unknown"
-                stars = element.find('span', class_='rating')
-                stars = stars.text.strip() if stars else "No rating"
-                comment = element.find('div', class_='body-text').text.strip()
-                date_element = element.find('span', class_='_nobr')
-                date = date_element.text.strip() if date_element else None
-
-                raw_review = {
-                    'username': username,
-                    'stars': stars,
-                    'comment': comment,
-                    'date': date
-                }
-                reviews.append(process_review(raw_review))
-            except Exception as e:
-                print(f"Error processing review: {e}")
-                continue
-        return reviews, True
+        return result.reviews, bool(result.reviews)
 
 def process_review(raw_review: dict) -> Review:
     """Process raw review data into a Review object"""
@@ -67,72 +173,202 @@ def process_review(raw_review: dict) -> Review:
         date=date
     )
 
-async def async_scrape_reviews(base_url: str, movie_name: str, max_concurrent: int = 5):
-    """Scrape all reviews for a movie asynchronously"""
-    REVIEWS_PER_PAGE = 12
-    existing_reviews = load_reviews(movie_name)
-    existing_reviews_count = len(existing_reviews)
-    
-    complete_pages = existing_reviews_count // REVIEWS_PER_PAGE
-    reviews_on_last_page = existing_reviews_count % REVIEWS_PER_PAGE
-    start_page = complete_pages + 1
-    
-    all_reviews = existing_reviews[:]
-    
-    print(f"Starting from page {start_page} (found {len(all_reviews)} existing reviews)")
-    
-    semaphore = asyncio.Semaphore(max_concurrent)
+def page_url(base_url: str, movie_name: str, page: int, order: Optional[str] = None) -> str:
+    """URL of a review page, in Letterboxd's default order or e.g. order='added' for newest first"""
+    if order:
+        return f"{base_url}/{movie_name}/reviews/by/{order}/page/{page}/"
+    return f"{base_url}/{movie_name}/reviews/page/{page}/"
+
+REVIEWS_PER_PAGE = 12
+
+def resume_point(movie_name: str, fmt: Optional[str] = None) -> Tuple[int, int]:
+    """First page to crawl for a movie and how many of its reviews are already stored"""
+    existing_reviews_count = count_reviews(movie_name, fmt)
+    print(f"{movie_name}: starting from page {existing_reviews_count // REVIEWS_PER_PAGE + 1} "
+          f"(found {existing_reviews_count} existing reviews)")
+    return existing_reviews_count // REVIEWS_PER_PAGE + 1, existing_reviews_count % REVIEWS_PER_PAGE
+
+def open_session(max_connections: int, replay: Optional[PageCache] = None) -> aiohttp.ClientSession:
+    """HTTP session with a keep-alive connection pool of max_connections, or a replay of a page cache"""
+    if replay is not None:
+        return ReplaySession(replay)
     timeout = aiohttp.ClientTimeout(total=10)
-    connector = aiohttp.TCPConnector(limit=max_concurrent)
+    connector = aiohttp.TCPConnector(limit=max_connections)
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
-    
-    async with aiohttp.ClientSession(timeout=timeout, connector=connector, headers=headers) as session:
-        first_page_url = f"{base_url}/{movie_name}/reviews/page/{start_page}/"
-        first_page_reviews, has_next = await scrape_single_page(session, first_page_url, semaphore)
-        
-        if first_page_reviews:
-            all_reviews.extend(first_page_reviews[reviews_on_last_page:])
-        
-        if not has_next:
-            return all_reviews
-
-        tasks = []
-        for page in range(start_page + 1, start_page + max_concurrent + 1):
-            page_url = f"{base_url}/{movie_name}/reviews/page/{page}/"
-            task = asyncio.create_task(scrape_single_page(session, page_url, semaphore))
-            tasks.append((page, task))
-        
-        while tasks:
-            new_tasks = []
-            for page_num, task in tasks:
+    return aiohttp.ClientSession(timeout=timeout, connector=connector, headers=headers)
+
+async def crawl_movie(session: aiohttp.ClientSession, executor: Executor, base_url: str, movie_name: str,
+                      fmt: Optional[str] = None, cache: Optional[PageCache] = None, sync: bool = False,
+                      on_page: Optional[Callable[[int, List[Review]], Awaitable[None]]] = None,
+                      **crawler_options) -> List[Review]:
+    """
+    Crawl the reviews of one movie that are not stored yet over an existing
+    session. on_page receives the new reviews of each page as it finishes.
+    """
+    if sync:
+        return await sync_movie(session, executor, base_url, movie_name, fmt, cache, on_page, **crawler_options)
+
+    start_page, reviews_on_last_page = resume_point(movie_name, fmt)
+
+    async def emit(page: int, reviews: List[Review]):
+        await on_page(page, reviews[reviews_on_last_page:] if page == start_page else reviews)
+
+    crawler = PageCrawler(
+        lambda page: fetch_review_page(session, page_url(base_url, movie_name, page), executor, cache),
+        start_page=start_page,
+        on_page=emit if on_page else None,
+        **crawler_options
+    )
+    pages = await crawler.run()
+
+    all_reviews = []
+    for page in sorted(pages):
+        reviews = pages[page]
+        all_reviews.extend(reviews[reviews_on_last_page:] if page == start_page else reviews)
+    return all_reviews
+
+async def sync_movie(session: aiohttp.ClientSession, executor: Executor, base_url: str, movie_name: str,
+                     fmt: Optional[str] = None, cache: Optional[PageCache] = None,
+                     on_page: Optional[Callable[[int, List[Review]], Awaitable[None]]] = None,
+                     **crawler_options) -> List[Review]:
+    """
+    Incremental sync: crawl the reviews newest first from page 1 and stop at
+    the first page whose reviews are all stored already. Assumes the store
+    holds a complete earlier crawl; with nothing stored it crawls every page.
+    """
+    known = known_reviews(movie_name, fmt)
+    print(f"{movie_name}: syncing newest reviews ({len(known)} stored)")
+
+    async def fetch_page(page: int) -> PageResult:
+        result = await fetch_review_page(session, page_url(base_url, movie_name, page, order='added'),
+                                         executor, cache)
+        if result.status == 200 and result.reviews and all(known.knows(r) for r in result.reviews):
+            # Reported as an empty page, which ends the crawl just before it
+            return PageResult(status=200, last_page=result.last_page)
+        return result
+
+    async def emit(page: int, reviews: List[Review]):
+        await on_page(page, [review for review in reviews if not known.knows(review)])
+
+    # Page 1 is fetched alone, so a refresh with nothing new costs one request;
+    # the rest are crawled concurrently only if it held new reviews
+    stats = crawler_options.setdefault('stats', CrawlStats())
+    started = time.perf_counter()
+    pages = await PageCrawler(fetch_page, start_page=1, end_page=1, on_page=emit if on_page else None,
+                              **{**crawler_options, 'workers': 1}).run()
+    if 1 in pages:
+        pages.update(await PageCrawler(fetch_page, start_page=2, on_page=emit if on_page else None,
+                                       **crawler_options).run())
+    stats.elapsed = time.perf_counter() - started
+    return [review for page in sorted(pages) for review in pages[page] if not known.knows(review)]
+
+def crawl_metrics(crawls, cache: Optional[PageCache] = None,
+                  cache_before: Optional[Tuple[int, int]] = None) -> Dict:
+    """Counters of finished crawls for the metrics recorder"""
+    crawls = list(crawls)
+    statuses = {}
+    for stats in crawls:
+        for status, count in stats.status_counts.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    counters = {
+        'rows': sum(stats.reviews for stats in crawls),
+        'pages': sum(stats.pages for stats in crawls),
+        'retries': sum(stats.retries for stats in crawls),
+        'errors': sum(stats.errors for stats in crawls),
+        'http_status': statuses
+    }
+    if cache is not None:
+        counters['page_cache'] = {'hits': cache.hits - cache_before[0], 'misses': cache.misses - cache_before[1]}
+    return counters
+
+async def async_scrape_reviews(base_url: str, movie_name: str, max_concurrent: int = 5, fmt: Optional[str] = None,
+                               max_concurrency: int = 32, stats: Optional[CrawlStats] = None,
+                               parse_processes: int = 0, cache: Optional[PageCache] = None,
+                               replay: bool = False, sync: bool = False):
+    """
+    Scrape the reviews of a movie that are not stored yet, asynchronously.
+    Concurrency starts at max_concurrent and adapts up to max_concurrency;
+    pass a CrawlStats to receive throughput and error counts. Pages are
+    parsed on a worker thread, or on parse_processes worker processes.
+    A PageCache makes requests conditional; with replay=True the pages are
+    read from the cache alone, without network access. sync=True fetches
+    only the newest reviews instead of resuming from the stored count.
+    """
+    stats = stats if stats is not None else CrawlStats()
+    with metrics.stage('scrape') as record:
+        cache_before = (cache.hits, cache.misses) if cache is not None else None
+        with parse_executor(parse_processes) as executor:
+            async with open_session(max(max_concurrent, max_concurrency), cache if replay else None) as session:
+                reviews = await crawl_movie(session, executor, base_url, movie_name, fmt,
+                                            None if replay else cache, sync,
+                                            concurrency=max_concurrent, max_concurrency=max_concurrency,
+                                            stats=stats)
+        record.update(crawl_metrics([stats], cache, cache_before))
+    return reviews
+
+async def scrape_movies(base_url: str, movies: List[str], max_concurrent: int = 5, fmt: Optional[str] = None,
+                        max_concurrency: int = 32, movies_at_once: int = 4, parse_processes: int = 0,
+                        on_movie_done: Optional[Callable[[str, List[Review], CrawlStats], None]] = None,
+                        cache: Optional[PageCache] = None, replay: bool = False,
+                        sync: bool = False) -> Dict[str, CrawlStats]:
+    """
+    Scrape many movies in one process over a shared connection pool.
+    All requests draw from one adaptive budget of max_concurrency slots;
+    movies_at_once movies are crawled side by side, each holding at most an
+    equal share of the budget. Every movie resumes from its own stored
+    reviews, and on_movie_done is called (on a worker thread) with its new
+    reviews as soon as it finishes, so finished movies are saved even if the
+    batch is interrupted later. cache, replay and sync work as in async_scrape_reviews.
+    """
+    limiter = AdaptiveLimiter(max_concurrent, maximum=max(max_concurrent, max_concurrency))
+    per_movie = max(1, -(-limiter.maximum // movies_at_once))
+    pending = list(dict.fromkeys(movies))
+    results: Dict[str, CrawlStats] = {}
+
+    async def movie_worker(session, executor):
+        while pending:
+            movie = pending.pop(0)
+            stats = results[movie] = CrawlStats()
+            try:
+                reviews = await crawl_movie(session, executor, base_url, movie, fmt, None if replay else cache,
+                                            sync, stats=stats, limiter=limiter, workers=per_movie)
+            except Exception as e:
+                print(f"Error scraping {movie}: {e}")
+                stats.errors += 1
+                continue
+            if on_movie_done is not None:
                 try:
-                    reviews, has_more = await task
-                    if reviews:
-                        all_reviews.extend(reviews)
-                    
-                    if has_more:
-                        next_page = page_num + max_concurrent
-                        page_url = f"{base_url}/{movie_name}/reviews/page/{next_page}/"
-                        new_task = asyncio.create_task(scrape_single_page(session, page_url, semaphore))
-                        new_tasks.append((next_page, new_task))
+                    await asyncio.to_thread(on_movie_done, movie, reviews, stats)
                 except Exception as e:
-                    print(f"Error processing page {page_num}: {e}")
-            
-            tasks = new_tasks
-            if not tasks:
-                break
-    
-    return all_reviews
+                    print(f"Error saving {movie}: {e}")
+                    stats.errors += 1
+
+    with metrics.stage('scrape') as record:
+        cache_before = (cache.hits, cache.misses) if cache is not None else None
+        with parse_executor(parse_processes) as executor:
+            async with open_session(limiter.maximum, cache if replay else None) as session:
+                await asyncio.gather(*(movie_worker(session, executor)
+                                       for _ in range(min(movies_at_once, len(pending)))))
+        record.update(crawl_metrics(results.values(), cache, cache_before))
+    return results
+
+def read_movie_list(path: str) -> List[str]:
+    """Movie slugs from a text file, one per line; blank lines and # comments are skipped"""
+    with open(path, encoding='utf-8') as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return [line for line in lines if line]
 
 if __name__ == "__main__":
     MOVIE_NAME = "wicked-2024"
     
     start_time = time.time()
-    reviews = asyncio.run(async_scrape_reviews(BASE_URL, MOVIE_NAME))
-    save_reviews(reviews, MOVIE_NAME)
+    stats = CrawlStats()
+    reviews = asyncio.run(async_scrape_reviews(BASE_URL, MOVIE_NAME, stats=stats))
+    append_reviews(reviews, MOVIE_NAME)
     end_time = time.time()
     
     print(f"Scraped {len(reviews)} reviews in {end_time - start_time:.2f} seconds")
+    print(f"Crawl: {stats.summary()}")
     print(f"Saved to 'db/letterboxd/raw/{MOVIE_NAME}.csv'")
\ No newline at end of file
@@ -0,0 +1,31 @@
+# storage/__init__.py
+import os
+
+from .base import StorageBackend
+from .csv_backend import CsvBackend
+from .parquet_backend import ParquetBackend
+
+SUPPORTED_FORMATS = ['csv', 'parquet']
+
+def get_backend(fmt: str) -> StorageBackend:
+    backends = {
+        'csv': CsvBackend,
+        'parquet': ParquetBackend
+    }
+    if fmt not in backends:
+        raise ValueError(f"Unsupported storage format: {fmt}")
+    return backends[fmt]()
+
+def backend_for_path(path: str) -> StorageBackend:
+    """Pick the backend from a file's extension"""
+    extension = os.path.splitext(path)[1].lower()
+    return get_backend('parquet' if extension in ('.parquet', '.pq') else 'csv')
+
+__all__ = [
+    'StorageBackend',
+    'CsvBackend',
+    'ParquetBackend',
+    'SUPPORTED_FORMATS',
+    'get_backend',
+    'backend_for_path'
+]
@@ -0,0 +1,29 @@
+# storage/base.py
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, Sequence
+
+import pandas as pd
+
+class StorageBackend(ABC):
+    extension: str = ''
+
+    @abstractmethod
+    def read(self, path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Read a table, optionally only the given columns"""
+        pass
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame, path: str):
+        """Write a table, replacing any existing file"""
+        pass
+
+    @abstractmethod
+    def iter_chunks(self, path: str, columns: Optional[Sequence[str]] = None,
+                    chunksize: int = 50000) -> Iterator[pd.DataFrame]:
+        """Read a table in chunks of at most chunksize rows"""
+        pass
+
+    @abstractmethod
+    def count(self, path: str) -> int:
+        """Number of rows in a table"""
+        pass
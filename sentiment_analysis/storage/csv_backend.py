@@ -0,0 +1,26 @@
+# storage/csv_backend.py
+from typing import Iterator, Optional, Sequence
+
+import pandas as pd
+
+from .base import StorageBackend
+
+class CsvBackend(StorageBackend):
+    extension = '.csv'
+
+    def read(self, path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        return pd.read_csv(path, usecols=columns)
+
+    def write(self, df: pd.DataFrame, path: str):
+        df.to_csv(path, index=False)
+
+    def iter_chunks(self, path: str, columns: Optional[Sequence[str]] = None,
+                    chunksize: int = 50000) -> Iterator[pd.DataFrame]:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+    def count(self, path: str) -> int:
+        # Reviews may contain quoted newlines, so rows have to be parsed rather than lines counted
+        try:
+            return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=100000))
+        except pd.errors.EmptyDataError:
+            return 0
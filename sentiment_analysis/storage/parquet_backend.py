@@ -0,0 +1,39 @@
+# storage/parquet_backend.py
+from typing import Iterator, Optional, Sequence
+
+import pandas as pd
+
+from .base import StorageBackend
+
+class ParquetBackend(StorageBackend):
+    """Columnar storage with typed columns, compression and column projection"""
+    extension = '.parquet'
+
+    def __init__(self, compression: str = 'zstd'):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("Parquet storage requires pyarrow (pip install pyarrow)") from e
+        self.compression = compression
+
+    def read(self, path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns).to_pandas()
+
+    def write(self, df: pd.DataFrame, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, path, compression=self.compression)
+
+    def iter_chunks(self, path: str, columns: Optional[Sequence[str]] = None,
+                    chunksize: int = 50000) -> Iterator[pd.DataFrame]:
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+
+    def count(self, path: str) -> int:
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
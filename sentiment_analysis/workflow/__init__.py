@@ -1,6 +1,14 @@
 # workflow/__init__.py
-from .sentiment_analyzer import SentimentAnalyzer
-from .plotter import SentimentPlotter
+
+def __getattr__(name):
+    # Imported on first access so the CLI only loads pandas/matplotlib when a command needs them
+    if name == 'SentimentAnalyzer':
+        from .sentiment_analyzer import SentimentAnalyzer
+        return SentimentAnalyzer
+    if name == 'SentimentPlotter':
+        from .plotter import SentimentPlotter
+        return SentimentPlotter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'SentimentAnalyzer',
@@ -1,32 +1,213 @@
 import re
-import pandas as pd
 import os
-from langdetect import detect, LangDetectException
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set, Tuple
+from langdetect import DetectorFactory, detect, LangDetectException
 import emoji
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 import nltk
 
-nltk.download('stopwords', quiet=True)
-nltk.download('wordnet', quiet=True)
+from .. import metrics
+from ..storage import backend_for_path, get_backend
+
+NLTK_RESOURCES = {'stopwords': 'corpora/stopwords', 'wordnet': 'corpora/wordnet'}
+
+def ensure_nltk_data():
+    """Download the NLTK corpora used by TextCleaner, only if they are not installed yet"""
+    for package, resource in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            try:
+                nltk.data.find(f'{resource}.zip')
+            except LookupError:
+                nltk.download(package, quiet=True)
+
+# langdetect is probabilistic; a fixed seed makes its answers reproducible
+DetectorFactory.seed = 0
+
+class EmojiIndex:
+    """Longest-match index over all emoji sequences (ZWJ, skin tones, flags, keycaps)"""
+
+    # Every emoji contains a non-ASCII code point; keycaps start with one of '#*0-9'
+    CANDIDATES = re.compile(r'[#*0-9]?[^\x00-\x7f]+')
 
-class TextCleaner:
     def __init__(self):
+        self.descriptions = {
+            sequence: data['en'].replace(':', '').replace('_', ' ')
+            for sequence, data in emoji.EMOJI_DATA.items()
+        }
+        lengths = {}
+        for sequence in self.descriptions:
+            lengths.setdefault(sequence[0], set()).add(len(sequence))
+        self.lengths = {char: sorted(sizes, reverse=True) for char, sizes in lengths.items()}
+
+    def _scan(self, chunk):
+        """Greedy longest-match scan of a run of non-ASCII characters"""
+        pos = 0
+        for i, char in enumerate(chunk):
+            if i < pos or char not in self.lengths:
+                continue
+            for size in self.lengths[char]:
+                if i + size > len(chunk):
+                    continue
+                sequence = chunk[i:i + size]
+                if sequence in self.descriptions:
+                    yield i, i + size, sequence
+                    pos = i + size
+                    break
+
+    def finditer(self, text):
+        """Yield (start, end, sequence) for each emoji in text, longest sequence first"""
+        if text.isascii():
+            return
+        for run in self.CANDIDATES.finditer(text):
+            chunk = run.group()
+            # Most runs are exactly one emoji, which needs a single lookup
+            if chunk in self.descriptions:
+                yield run.start(), run.end(), chunk
+                continue
+            offset = run.start()
+            for start, end, sequence in self._scan(chunk):
+                yield offset + start, offset + end, sequence
+
+    def describe(self, text):
+        """Return the descriptions of all emojis in text"""
+        if text.isascii():
+            return []
+        descriptions = []
+        for chunk in self.CANDIDATES.findall(text):
+            description = self.descriptions.get(chunk)
+            if description is not None:
+                descriptions.append(description)
+            else:
+                descriptions.extend([self.descriptions[sequence] for _, _, sequence in self._scan(chunk)])
+        return descriptions
+
+    def contains(self, text):
+        """Check whether text contains at least one emoji"""
+        return next(self.finditer(text), None) is not None
+
+    def split(self, text):
+        """Remove emojis from text and return (text_without_emojis, descriptions)"""
+        if text.isascii():
+            return text, []
+        descriptions = []
+
+        def strip_run(run):
+            chunk = run.group()
+            if chunk in self.descriptions:
+                descriptions.append(self.descriptions[chunk])
+                return ''
+            parts, last = [], 0
+            for start, end, sequence in self._scan(chunk):
+                parts.append(chunk[last:start])
+                descriptions.append(self.descriptions[sequence])
+                last = end
+            parts.append(chunk[last:])
+            return ''.join(parts)
+
+        return self.CANDIDATES.sub(strip_run, text), descriptions
+
+# Languages whose stopwords keep a text off the English fast path; all ship with NLTK's stopwords corpus
+FOREIGN_STOPWORD_LANGUAGES = ('german', 'french', 'spanish', 'portuguese', 'italian', 'dutch',
+                              'swedish', 'danish', 'norwegian', 'finnish', 'romanian', 'indonesian')
+
+def _foreign_stopwords(english: Set[str]) -> Set[str]:
+    """Stopwords of the other languages that are not English stopwords too; missing lists are skipped"""
+    words = set()
+    for language in FOREIGN_STOPWORD_LANGUAGES:
+        try:
+            words.update(stopwords.words(language))
+        except (OSError, LookupError):
+            continue
+    return words - english
+
+class TextCleaner:
+    # Share of English stopwords longer than two letters above which an ASCII text is
+    # taken as English without langdetect; shorter ones ('a', 'no', 'me', 'so') are common
+    # in other languages as well
+    ENGLISH_STOPWORD_RATIO = 0.3
+    ENGLISH_MIN_WORDS = 5
+    # Share of other languages' stopwords at or above which the English fast path is skipped
+    FOREIGN_STOPWORD_RATIO = 0.1
+    # Share of non-ASCII letters above which a text is taken as non-English without langdetect
+    FOREIGN_LETTER_RATIO = 0.5
+
+    def __init__(self, lemma_cache_size: int = 100_000):
+        ensure_nltk_data()
         self.lemmatizer = WordNetLemmatizer()
         self.stopwords = set(stopwords.words('english'))
+        self.english_markers = {word for word in self.stopwords if len(word) > 2}
+        self.foreign_stopwords = _foreign_stopwords(self.stopwords)
+        self.emojis = EmojiIndex()
+        self.lemma_cache_size = lemma_cache_size
+        self._lemmas: Dict[str, str] = {}
+        self.counters = dict.fromkeys(
+            ['lemma_hits', 'lemma_misses', 'lang_fast_en', 'lang_fast_other', 'lang_detect'], 0
+        )
+
+    def lemmatize(self, word):
+        """Lemmatize a single word through a bounded memo cache"""
+        lemma = self._lemmas.get(word)
+        if lemma is not None:
+            self.counters['lemma_hits'] += 1
+            return lemma
+        self.counters['lemma_misses'] += 1
+        if len(self._lemmas) >= self.lemma_cache_size:
+            # Evict the oldest entry; dicts keep insertion order
+            del self._lemmas[next(iter(self._lemmas))]
+        lemma = self._lemmas[word] = self.lemmatizer.lemmatize(word)
+        return lemma
+
+    def is_english(self, text):
+        """
+        Tiered language check: decide obvious cases from the ASCII share and
+        stopword ratio, and only run langdetect on the ambiguous rest
+        """
+        words = text.split()
+        if text.isascii():
+            if len(words) >= self.ENGLISH_MIN_WORDS:
+                english = sum(1 for word in words if word in self.english_markers)
+                foreign = sum(1 for word in words if word in self.foreign_stopwords)
+                if (english / len(words) >= self.ENGLISH_STOPWORD_RATIO
+                        and foreign / len(words) < self.FOREIGN_STOPWORD_RATIO):
+                    self.counters['lang_fast_en'] += 1
+                    return True
+        else:
+            letters = [char for char in text if char.isalpha()]
+            foreign = sum(1 for char in letters if not char.isascii())
+            if letters and foreign / len(letters) > self.FOREIGN_LETTER_RATIO:
+                self.counters['lang_fast_other'] += 1
+                return False
+
+        self.counters['lang_detect'] += 1
+        try:
+            return detect(text) == 'en'
+        except LangDetectException:
+            return False
+
+    def cache_stats(self) -> Dict[str, float]:
+        """Counters and hit rates of the lemma cache and the language fast path"""
+        counters = self.counters
+        lemma_total = counters['lemma_hits'] + counters['lemma_misses']
+        lang_fast = counters['lang_fast_en'] + counters['lang_fast_other']
+        lang_total = lang_fast + counters['lang_detect']
+        return {
+            **counters,
+            'lemma_hit_rate': round(counters['lemma_hits'] / lemma_total, 4) if lemma_total else 0.0,
+            'lang_fast_path_rate': round(lang_fast / lang_total, 4) if lang_total else 0.0
+        }
 
     def extract_emojis(self, text):
         """Extract emojis from text and return their descriptions"""
-        emoji_list = []
-        for char in text:
-            if char in emoji.EMOJI_DATA:
-                emoji_name = emoji.EMOJI_DATA[char]['en'].replace(':', '').replace('_', ' ')
-                emoji_list.append(emoji_name)
-        return ' '.join(emoji_list) if emoji_list else ''
+        return ' '.join(self.emojis.describe(text))
 
     def clean_text(self, text):
         """Clean text and convert emojis to descriptions. Also remove non-English text."""
-        emoji_content = self.extract_emojis(text)
+        text, emoji_descriptions = self.emojis.split(text)
+        emoji_content = ' '.join(emoji_descriptions)
         
         text = re.sub(r'http\S+', '', text)
         text = re.sub(r'<.*?>', '', text)
@@ -34,10 +215,7 @@ class TextCleaner:
         
         cleaned_text = f"{text.lower()} {emoji_content}".strip()
         
-        try:
-            if detect(cleaned_text) != 'en':
-                return ''
-        except LangDetectException:
+        if not self.is_english(cleaned_text):
             return ''
         
         return cleaned_text
@@ -45,15 +223,19 @@ class TextCleaner:
     def remove_stopwords(self, text):
         """Remove stopwords but keep emoji descriptions"""
         words = text.split()
+        if not self.emojis.contains(text):
+            return " ".join([word for word in words if word not in self.stopwords])
         filtered = [word for word in words if word not in self.stopwords or 
-                   any(char in emoji.EMOJI_DATA for char in word)]
+                   self.emojis.contains(word)]
         return " ".join(filtered)
 
     def lemmatize_text(self, text):
         """Lemmatize while preserving emoji content"""
         words = text.split()
-        lemmatized = [self.lemmatizer.lemmatize(word) 
-                     if not any(char in emoji.EMOJI_DATA for char in word) 
+        if not self.emojis.contains(text):
+            return ' '.join([self.lemmatize(word) for word in words])
+        lemmatized = [self.lemmatize(word) 
+                     if not self.emojis.contains(word) 
                      else word for word in words]
         return ' '.join(lemmatized)
 
@@ -66,10 +248,27 @@ class TextCleaner:
         text = self.lemmatize_text(text)
         return text
 
+_worker_cleaner: TextCleaner = None
+
+def _init_worker(cleaner: TextCleaner):
+    """Keep one TextCleaner per worker process"""
+    global _worker_cleaner
+    _worker_cleaner = cleaner
+
+def _preprocess_batch(texts: List[str]) -> Tuple[List[str], Dict[str, int]]:
+    """Preprocess a batch of texts with the worker's cleaner and report its counter deltas"""
+    before = dict(_worker_cleaner.counters)
+    cleaned = [_worker_cleaner.preprocess_text(text) for text in texts]
+    return cleaned, {key: value - before[key] for key, value in _worker_cleaner.counters.items()}
+
 class CsvCleaner:
-    def __init__(self, cleaner: TextCleaner, base_path='out/db/letterboxd/clean/'):
+    def __init__(self, cleaner: TextCleaner, base_path='out/db/letterboxd/clean/',
+                 workers: int = 1, batch_size: int = 500, fmt: str = 'csv'):
         self.cleaner = cleaner
         self.base_path = base_path
+        self.fmt = fmt
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
 
     def normalize_rating(self, rating):
         """Normalize rating from Letterboxd scale (0.5-5.0) to range [0-1]"""
@@ -85,26 +284,63 @@ class CsvCleaner:
         """Remove duplicate reviews based on the 'review' column"""
         return df.drop_duplicates(subset=['review'], keep='first')
 
+    def preprocess_reviews(self, reviews: List[str]) -> List[str]:
+        """Preprocess reviews, spreading batches over a process pool when workers > 1"""
+        if self.workers == 1 or len(reviews) <= self.batch_size:
+            return [self.cleaner.preprocess_text(review) for review in reviews]
+
+        batches = [reviews[i:i + self.batch_size] for i in range(0, len(reviews), self.batch_size)]
+        cleaned = []
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_worker,
+                                 initargs=(self.cleaner,)) as executor:
+            for texts, counters in executor.map(_preprocess_batch, batches):
+                cleaned.extend(texts)
+                # Fold the workers' counters back so cache_stats covers the whole run
+                for key, value in counters.items():
+                    self.cleaner.counters[key] += value
+        return cleaned
+
     def clean_csv(self, input_path, movie_name):
-        """Clean the CSV file and store it in the specified directory"""
-        df = pd.read_csv(input_path)
-        
-        df = df[['review', 'score']].dropna(subset=['review'])
-        df['review'] = df['review'].apply(lambda x: self.cleaner.preprocess_text(x))
-        df = df[df['review'] != '']
-        df['score'] = df['score'].apply(self.normalize_rating)
-        df = df.dropna(subset=['score'])
+        """Clean the CSV or Parquet file and store it in the specified directory"""
+        with metrics.stage('clean.read') as record:
+            df = backend_for_path(input_path).read(input_path, columns=['review', 'score'])
+            record['rows'] = len(df)
+        self.clean_frame(df, movie_name)
 
-        df = self.remove_duplicates(df)
+    def clean_frame(self, df, movie_name):
+        """Clean a DataFrame of raw reviews and store it in the specified directory"""
+        with metrics.stage('clean') as record:
+            counters_before = dict(self.cleaner.counters)
+            record['rows'] = len(df)
+            df = df[['review', 'score']].dropna(subset=['review'])
+            df['score'] = df['score'].apply(self.normalize_rating)
+            df = df.dropna(subset=['score'])
 
-        if not os.path.exists(self.base_path):
-            os.makedirs(self.base_path)
-        
-        output_path = os.path.join(self.base_path, f"{movie_name}.csv")
-        df[['review', 'score']].to_csv(output_path, index=False)
+            # Identical raw texts clean to the same result, so only clean them once
+            df = self.remove_duplicates(df)
+            with metrics.stage('clean.preprocess') as preprocess:
+                preprocess['rows'] = len(df)
+                df['review'] = self.preprocess_reviews(df['review'].tolist())
+            df = df[df['review'] != '']
+
+            df = self.remove_duplicates(df)
+
+            if not os.path.exists(self.base_path):
+                os.makedirs(self.base_path)
+            
+            output_path = os.path.join(self.base_path, f"{movie_name}.{self.fmt}")
+            get_backend(self.fmt).write(df[['review', 'score']], output_path)
+            record['rows_out'] = len(df)
+            record['cleaner'] = {key: value - counters_before[key] for key, value in self.cleaner.counters.items()}
 
         print(f"Cleaned data saved to {output_path}")
 
+        stats = self.cleaner.cache_stats()
+        print(f"Lemma cache hit rate: {stats['lemma_hit_rate']:.1%}, "
+              f"language fast path rate: {stats['lang_fast_path_rate']:.1%} "
+              f"({stats['lang_detect']} langdetect calls)")
+
 if __name__ == "__main__":
     text_cleaner = TextCleaner()
     csv_cleaner = CsvCleaner(text_cleaner)
@@ -0,0 +1,134 @@
+# workflow/corpus.py
+import glob
+import json
+import os
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from ..storage import get_backend
+from .sentiment_analyzer import COMPOUND_EDGES, SCORE_EDGES, RunningTotals, SentimentAnalyzer
+
+SUMMARY_KEY = ['movie', 'model']
+
+def find_movie_files(directory: str) -> Dict[str, str]:
+    """Clean review file per movie in a directory, preferring the newest if CSV and Parquet both exist"""
+    files = {}
+    for path in glob.glob(os.path.join(directory, '*.csv')) + glob.glob(os.path.join(directory, '*.parquet')):
+        movie = os.path.splitext(os.path.basename(path))[0]
+        if movie not in files or os.path.getmtime(path) > os.path.getmtime(files[movie]):
+            files[movie] = path
+    return dict(sorted(files.items()))
+
+def summary_row(movie: str, analyzer: SentimentAnalyzer, totals: RunningTotals) -> Dict:
+    """One summary table row: aggregates, label counts and histogram bins of a movie"""
+    results = analyzer.totals_to_results(totals)
+    row = {'movie': movie, 'model': analyzer.model_type, 'total_reviews': totals.total}
+    row.update({f'avg_{name}': value for name, value in results['average_scores'].items()})
+    for label, count in results['sentiment_distribution'].items():
+        row[f'{label}_count'] = count
+        row[f'{label}_pct'] = results['sentiment_percentages'][label]
+    row.update(results['comparison'])
+    row.update({f'compound_bin_{i:02d}': int(n) for i, n in enumerate(totals.compound_hist)})
+    row.update({f'score_bin_{i:02d}': int(n) for i, n in enumerate(totals.score_hist)})
+    return row
+
+class CorpusSummary:
+    """
+    Summary table with one row per (movie, model) plus a JSON index that
+    records which source file and model artifact every row was built from,
+    so unchanged movies are skipped on the next run.
+    """
+
+    def __init__(self, out_dir: str = 'out/summary', fmt: str = 'csv'):
+        self.out_dir = out_dir
+        self.backend = get_backend(fmt)
+        self.table_path = os.path.join(out_dir, f'summary{self.backend.extension}')
+        self.index_path = os.path.join(out_dir, 'index.json')
+        self.index = self._load_index()
+        self.rows: List[Dict] = []
+
+    def _load_index(self) -> Dict:
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding='utf-8') as f:
+                return json.load(f)
+        return {'movies': {}}
+
+    @staticmethod
+    def _source_state(path: str) -> Dict:
+        stat = os.stat(path)
+        return {'source': path, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def is_current(self, movie: str, path: str, model: str, artifact: str) -> bool:
+        """Whether the stored row for this movie and model was built from the same file and artifact"""
+        entry = self.index['movies'].get(movie)
+        if not entry or not os.path.exists(self.table_path):
+            return False
+        state = self._source_state(path)
+        if any(entry.get(key) != value for key, value in state.items()):
+            return False
+        return entry.get('models', {}).get(model, {}).get('artifact') == artifact
+
+    def add(self, movie: str, path: str, row: Dict, artifact: str):
+        entry = self.index['movies'].get(movie)
+        state = self._source_state(path)
+        if not entry or any(entry.get(key) != value for key, value in state.items()):
+            # The source changed, so rows of other models are stale as well
+            entry = {**state, 'models': {}}
+        entry['models'][row['model']] = {'artifact': artifact, 'total_reviews': row['total_reviews']}
+        self.index['movies'][movie] = entry
+        self.rows.append(row)
+
+    def save(self) -> pd.DataFrame:
+        """Merge the new rows into the summary table and write it with the index"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        # Without rows (an empty directory or only empty files) the table still gets its key columns
+        table = pd.DataFrame(self.rows) if self.rows else pd.DataFrame(columns=SUMMARY_KEY)
+        if os.path.exists(self.table_path):
+            existing = self.backend.read(self.table_path)
+            # Keep rows that are still indexed and were not rebuilt in this run
+            current = {(movie, model) for movie, entry in self.index['movies'].items()
+                       for model in entry['models']}
+            current -= {(row['movie'], row['model']) for row in self.rows}
+            keep = [key in current for key in zip(existing['movie'], existing['model'])]
+            table = pd.concat([existing[keep], table], ignore_index=True)
+        table = table.sort_values(SUMMARY_KEY, ignore_index=True)
+        self.backend.write(table, self.table_path)
+
+        self.index.update({
+            'summary': os.path.basename(self.table_path),
+            'updated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'compound_edges': COMPOUND_EDGES.tolist(),
+            'score_edges': SCORE_EDGES.tolist()
+        })
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        return table
+
+def analyze_corpus(analyzer: SentimentAnalyzer, directory: str, out_dir: str = 'out/summary',
+                   fmt: str = 'csv', chunk_size: int = 50000, force: bool = False,
+                   on_movie: Optional[Callable[[str, Optional[Dict]], None]] = None) -> pd.DataFrame:
+    """
+    Score every movie file in a directory with one scoring pool and write the
+    summary table and index. Movies whose file and model artifact did not
+    change since the last run are skipped unless force is set.
+    """
+    summary = CorpusSummary(out_dir, fmt)
+    artifact = analyzer.model.artifact_hash()
+    pending = {}
+    for movie, path in find_movie_files(directory).items():
+        if not force and summary.is_current(movie, path, analyzer.model_type, artifact):
+            if on_movie:
+                on_movie(movie, None)
+        else:
+            pending[movie] = path
+
+    for movie, totals in analyzer.accumulate_many(pending, chunk_size):
+        if totals.total == 0:
+            continue
+        row = summary_row(movie, analyzer, totals)
+        summary.add(movie, pending[movie], row, artifact)
+        if on_movie:
+            on_movie(movie, row)
+    return summary.save()
@@ -0,0 +1,71 @@
+# workflow/feature_store.py
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+# Members of scipy.sparse.save_npz's CSR layout, so scipy.sparse.load_npz reads the files as well
+MATRIX_ARRAYS = ('data', 'indices', 'indptr', 'shape')
+
+def feature_path(source_path: str, vectorizer_hash: str) -> str:
+    """TF-IDF matrix file of a clean review file, e.g. clean/<movie>.tfidf-<hash>.npz"""
+    return f'{os.path.splitext(source_path)[0]}.tfidf-{vectorizer_hash[:12]}.npz'
+
+def _source_state(path: str) -> np.ndarray:
+    stat = os.stat(path)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+def save_features(path: str, matrix, source_path: str):
+    """
+    Write a CSR matrix with the size and mtime of the file it was built from.
+    Members are stored uncompressed: a deflated array has to be inflated into
+    new memory on every load, a stored one can be mapped in place.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                 shape=np.array(matrix.shape), format=np.array(b'csr'), source=_source_state(source_path))
+    os.replace(tmp_path, path)
+
+def _map_member(path: str, archive: zipfile.ZipFile, name: str) -> np.ndarray:
+    """Memory-map one .npy member of an .npz archive; deflated members are read into memory"""
+    info = archive.getinfo(f'{name}.npy')
+    if info.compress_type != zipfile.ZIP_STORED:
+        with archive.open(info) as member:
+            return np.lib.format.read_array(member)
+
+    with open(path, 'rb') as f:
+        # The local file header's name and extra field lengths can differ from the central directory's
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack('<HH', f.read(4))
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if int(np.prod(shape)) == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+def load_features(path: str, source_path: str):
+    """
+    The CSR matrix stored for a source file with its arrays mapped from disk,
+    or None if there is none or the source changed since it was written
+    """
+    from scipy.sparse import csr_matrix
+
+    if not os.path.exists(path):
+        return None
+    try:
+        with zipfile.ZipFile(path) as archive:
+            arrays = {name: _map_member(path, archive, name) for name in (*MATRIX_ARRAYS, 'source')}
+    except (KeyError, ValueError, zipfile.BadZipFile):
+        return None
+    if not np.array_equal(arrays['source'], _source_state(source_path)):
+        return None
+    return csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']),
+                      shape=tuple(int(n) for n in arrays['shape']), copy=False)
@@ -0,0 +1,237 @@
+# workflow/pipeline.py
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .. import metrics
+from ..sources.letterboxd.crawler import CrawlStats
+from ..sources.letterboxd.db import append_reviews
+from ..sources.letterboxd.model import Review
+from ..sources.letterboxd.page_cache import PageCache
+from ..sources.letterboxd.scraper import crawl_metrics, crawl_movie, open_session, parse_executor
+from .cleaning import CsvCleaner, TextCleaner, _init_worker, _preprocess_batch
+from .sentiment_analyzer import RunningTotals, SentimentAnalyzer
+
+@dataclass
+class PipelineStats:
+    """Counts and timings of one pipeline run; busy times are summed per stage"""
+    crawl: CrawlStats = field(default_factory=CrawlStats)
+    raw_reviews: int = 0
+    cleaned: int = 0
+    dropped: int = 0
+    scored: int = 0
+    clean_busy: float = 0.0
+    score_busy: float = 0.0
+    first_result: Optional[float] = None
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        first = f"{self.first_result:.2f}s" if self.first_result is not None else 'n/a'
+        return (f"{self.raw_reviews} reviews scraped, {self.cleaned} cleaned ({self.dropped} dropped), "
+                f"{self.scored} scored in {self.elapsed:.2f}s; first result after {first}; "
+                f"busy: scrape {self.crawl.elapsed:.2f}s, clean {self.clean_busy:.2f}s, "
+                f"score {self.score_busy:.2f}s")
+
+async def _collect(queue: asyncio.Queue, limit: int) -> Tuple[list, bool]:
+    """
+    Wait for one queued list, then take the lists already waiting until they
+    hold limit items; stops at and reports the end marker (None)
+    """
+    batch, size = [], 0
+    item = await queue.get()
+    while item is not None:
+        batch.append(item)
+        size += len(item)
+        if size >= limit or queue.empty():
+            return batch, False
+        item = queue.get_nowait()
+    return batch, True
+
+async def _run_stages(*stages) -> list:
+    """
+    Run stages concurrently and return their results. When one fails the
+    others are cancelled, so none is left waiting on a queue nobody reads.
+    """
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in tasks:
+            task.cancel()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    # Report the failure that stopped the run, not the cancellations it caused
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise outcome
+    return outcomes
+
+class ReviewPipeline:
+    """
+    Scrape, clean and score one movie as concurrent stages. Pages flow from
+    the crawler through bounded queues into cleaning workers and then into
+    scoring, so a slow stage holds back the ones before it instead of
+    letting work pile up. Scores are written to a CSV as each batch is done.
+    """
+
+    def __init__(self, analyzer: SentimentAnalyzer, cleaner: TextCleaner, base_url: str,
+                 fmt: str = 'csv', clean_workers: int = 1, queue_size: int = 8,
+                 batch_size: int = 256, output_path: Optional[str] = None):
+        self.analyzer = analyzer
+        self.cleaner = cleaner
+        self.rating = CsvCleaner(cleaner)
+        self.base_url = base_url
+        self.fmt = fmt
+        self.clean_workers = max(1, clean_workers)
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.output_path = output_path
+        self.stats = PipelineStats()
+        self.totals = RunningTotals()
+        self._seen_raw = set()
+        self._seen_clean = set()
+        self._chunks_written = 0
+
+    def _clean_executor(self) -> Executor:
+        if self.clean_workers > 1:
+            return ProcessPoolExecutor(max_workers=self.clean_workers, initializer=_init_worker,
+                                       initargs=(self.cleaner,))
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix='clean')
+
+    def _clean_batch(self, texts: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """Clean texts on the calling thread; the single-worker counterpart of _preprocess_batch"""
+        return [self.cleaner.preprocess_text(text) for text in texts], {}
+
+    async def _scrape(self, session, parse_pool: Executor, cache: Optional[PageCache], sync: bool,
+                      pages: asyncio.Queue, movie: str, crawler_options: Dict) -> List[Review]:
+        async def emit(page: int, reviews: List[Review]):
+            await pages.put(reviews)
+
+        reviews = await crawl_movie(session, parse_pool, self.base_url, movie, self.fmt, cache, sync,
+                                    on_page=emit, stats=self.stats.crawl, **crawler_options)
+        # End markers are only sent on success; on failure _run_stages cancels the consumers
+        for _ in range(self.clean_workers):
+            await pages.put(None)
+        return reviews
+
+    async def _clean(self, pool: Executor, pages: asyncio.Queue, cleaned: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        clean = _preprocess_batch if self.clean_workers > 1 else self._clean_batch
+        done = False
+        while not done:
+            batch, done = await _collect(pages, self.batch_size)
+            rows = []
+            for review in (review for page in batch for review in page):
+                self.stats.raw_reviews += 1
+                score = self.rating.normalize_rating(review.score)
+                # Identical raw texts clean to the same result, so only clean them once
+                if not review.review or score is None or review.review in self._seen_raw:
+                    self.stats.dropped += 1
+                    continue
+                self._seen_raw.add(review.review)
+                rows.append((review.review, score))
+            if not rows:
+                continue
+
+            started = time.perf_counter()
+            texts, counters = await loop.run_in_executor(pool, clean, [text for text, _ in rows])
+            self.stats.clean_busy += time.perf_counter() - started
+            for key, value in counters.items():
+                self.cleaner.counters[key] += value
+
+            kept = []
+            for text, (_, score) in zip(texts, rows):
+                if text and text not in self._seen_clean:
+                    self._seen_clean.add(text)
+                    kept.append((text, score))
+            self.stats.cleaned += len(kept)
+            self.stats.dropped += len(rows) - len(kept)
+            if kept:
+                await cleaned.put(kept)
+
+    def _score_chunk(self, rows: List[Tuple[str, float]]):
+        """Score a chunk of cleaned reviews, fold it into the totals and append it to the output"""
+        texts = [text for text, _ in rows]
+        scores = np.array([score for _, score in rows], dtype=np.float64)
+        sentiments = self.analyzer.score_reviews(texts)
+        normalized = self.analyzer.add_to_totals(self.totals, scores, sentiments)
+        if self.output_path:
+            out = pd.DataFrame({'review': texts, 'score': scores, **sentiments,
+                                'normalized_compound': normalized})
+            out.to_csv(self.output_path, mode='w' if self._chunks_written == 0 else 'a',
+                       header=self._chunks_written == 0, index=False)
+        self._chunks_written += 1
+
+    async def _score(self, cleaned: asyncio.Queue, started: float):
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='score') as pool:
+            done = False
+            while not done:
+                batch, done = await _collect(cleaned, self.batch_size)
+                rows = [row for chunk in batch for row in chunk]
+                if not rows:
+                    continue
+                began = time.perf_counter()
+                await loop.run_in_executor(pool, self._score_chunk, rows)
+                self.stats.score_busy += time.perf_counter() - began
+                self.stats.scored += len(rows)
+                if self.stats.first_result is None:
+                    self.stats.first_result = time.perf_counter() - started
+
+    async def run(self, movie: str, cache: Optional[PageCache] = None, replay: bool = False,
+                  sync: bool = False, parse_processes: int = 0, concurrency: int = 5,
+                  max_concurrency: int = 32) -> List[Review]:
+        """Run all stages for one movie and return the newly scraped raw reviews"""
+        started = time.perf_counter()
+        if self.output_path:
+            os.makedirs(os.path.dirname(self.output_path) or '.', exist_ok=True)
+        pages: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        cleaned: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def clean_stage(pool):
+            await _run_stages(*(self._clean(pool, pages, cleaned) for _ in range(self.clean_workers)))
+            await cleaned.put(None)
+
+        crawler_options = {'concurrency': concurrency, 'max_concurrency': max_concurrency}
+        with parse_executor(parse_processes) as parse_pool, self._clean_executor() as clean_pool:
+            async with open_session(max(concurrency, max_concurrency), cache if replay else None) as session:
+                reviews, _, _ = await _run_stages(
+                    self._scrape(session, parse_pool, None if replay else cache, sync, pages, movie,
+                                 crawler_options),
+                    clean_stage(clean_pool),
+                    self._score(cleaned, started)
+                )
+        self.stats.elapsed = time.perf_counter() - started
+        return reviews
+
+    def results(self) -> Dict:
+        """Aggregate results of the scored reviews, in the streaming analyze schema"""
+        if self.totals.total == 0:
+            return {'total_reviews': 0}
+        return self.analyzer.totals_to_results(self.totals)
+
+def run_pipeline(movie: str, base_url: str, model_name: str = 'vader', fmt: str = 'csv',
+                 clean_workers: int = 1, queue_size: int = 8, batch_size: int = 256,
+                 output_path: Optional[str] = None, save_raw: bool = True,
+                 **run_options) -> Tuple[Dict, PipelineStats]:
+    """
+    Scrape, clean and score a movie's new reviews concurrently, store the raw
+    reviews like senti scrape does and return the aggregate results and stats
+    """
+    pipeline = ReviewPipeline(SentimentAnalyzer(model_name), TextCleaner(), base_url, fmt,
+                              clean_workers, queue_size, batch_size, output_path)
+    with metrics.stage('pipeline') as record:
+        reviews = asyncio.run(pipeline.run(movie, **run_options))
+        stats = pipeline.stats
+        record.update(crawl_metrics([stats.crawl]), rows=stats.scored, cleaned=stats.cleaned,
+                      dropped=stats.dropped, clean_busy_s=stats.clean_busy, score_busy_s=stats.score_busy,
+                      first_result_s=stats.first_result)
+    if save_raw:
+        with metrics.stage('store') as record:
+            record['rows'] = append_reviews(reviews, movie, fmt)
+    return pipeline.results(), pipeline.stats
@@ -1,5 +1,7 @@
 # workflow/plotter.py
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+import numpy as np
 import seaborn as sns
 import pandas as pd
 from pathlib import Path
@@ -7,6 +9,14 @@ from typing import Dict, Optional
 from dataclasses import dataclass
 from typing import Dict, Optional, Callable, Tuple
 
+from .. import metrics
+
+# Above this many reviews the comparison panels are drawn from binned data
+EXACT_LIMIT = 20000
+# Evaluation grid of the binned KDE and bins per axis of the 2D histogram
+KDE_GRID = np.linspace(-0.25, 1.25, 301)
+HIST_BINS = 40
+
 @dataclass
 class PlotConfig:
     title: str
@@ -15,20 +25,121 @@ class PlotConfig:
     plot_func: Callable
     subplot_args: Dict = None
 
+@dataclass
+class ComparisonData:
+    """Everything the comparison panels draw, prepared once per results dict"""
+    correlation: float
+    frame: Optional[pd.DataFrame] = None
+    review_density: Optional[np.ndarray] = None
+    sentiment_density: Optional[np.ndarray] = None
+    hist: Optional[np.ndarray] = None
+    fit: Optional[Tuple[float, float]] = None
+    sample: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+def binned_kde(values: np.ndarray, grid: np.ndarray = KDE_GRID) -> np.ndarray:
+    """
+    Gaussian KDE on a fixed grid: bin the values once, then smooth the counts
+    with a Gaussian of Scott's bandwidth (seaborn's default)
+    """
+    from scipy.ndimage import gaussian_filter1d
+
+    values = values[np.isfinite(values)]
+    step = grid[1] - grid[0]
+    if len(values) < 2 or values.std() == 0:
+        return np.zeros(len(grid))
+    edges = np.append(grid - step / 2, grid[-1] + step / 2)
+    counts = np.histogram(values, edges)[0].astype(np.float64)
+    bandwidth = values.std(ddof=1) * len(values) ** -0.2
+    return gaussian_filter1d(counts, bandwidth / step, mode='constant') / (len(values) * step)
+
+def stratified_sample(review_scores: np.ndarray, size: int, seed: int = 0) -> np.ndarray:
+    """Indices of a sample that keeps the share of each review score decile"""
+    rng = np.random.default_rng(seed)
+    strata = np.clip(np.nan_to_num(review_scores * 10), 0, 9).astype(int)
+    picked = []
+    for stratum in np.unique(strata):
+        members = np.flatnonzero(strata == stratum)
+        take = min(len(members), max(1, round(size * len(members) / len(review_scores))))
+        picked.append(rng.choice(members, take, replace=False))
+    return np.sort(np.concatenate(picked)) if picked else np.empty(0, dtype=int)
+
 class SentimentPlotter:
-    def __init__(self, output_dir: Optional[str] = None):
+    def __init__(self, output_dir: Optional[str] = None, mode: str = 'auto',
+                 sample_size: Optional[int] = None):
+        """
+        mode: 'exact' draws every review with seaborn, 'binned' draws
+        grid KDEs and a 2D histogram, 'auto' picks binned above EXACT_LIMIT
+        reviews. sample_size overlays a stratified sample on binned plots.
+        """
+        if mode not in ('auto', 'exact', 'binned'):
+            raise ValueError(f"Unknown plot mode: {mode}")
         self.output_dir = Path(output_dir) if output_dir else None
         if self.output_dir:
             self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.sample_size = sample_size
+        self._shared: Optional[Tuple[Dict, ComparisonData]] = None
         plt.style.use("seaborn-v0_8")
         plt.ioff()
+
+    def _comparison_data(self, comparison: Dict) -> ComparisonData:
+        """Prepare the comparison panels' data, reusing it for the same results"""
+        if self._shared is not None and self._shared[0] is comparison:
+            return self._shared[1]
+        x = np.asarray(comparison['review_scores'], dtype=np.float64)
+        y = np.asarray(comparison['sentiment_scores'], dtype=np.float64)
+        data = ComparisonData(correlation=comparison['correlation'])
+
+        if self.mode == 'exact' or (self.mode == 'auto' and len(x) <= EXACT_LIMIT):
+            data.frame = pd.DataFrame({'score': x, 'normalized_compound': y})
+        else:
+            data.review_density = binned_kde(x)
+            data.sentiment_density = binned_kde(y)
+            valid = np.isfinite(x) & np.isfinite(y)
+            data.hist = np.histogram2d(x[valid], y[valid], HIST_BINS, range=[[0, 1], [0, 1]])[0]
+            if valid.sum() > 1 and np.ptp(x[valid]) > 0:
+                data.fit = tuple(np.polyfit(x[valid], y[valid], 1))
+            if self.sample_size:
+                index = stratified_sample(x[valid], self.sample_size)
+                data.sample = (x[valid][index], y[valid][index])
+
+        self._shared = (comparison, data)
+        return data
+
+    def _draw_distribution(self, ax, data: ComparisonData):
+        if data.frame is not None:
+            sns.kdeplot(data=data.frame, x='score', label='Review Scores', ax=ax)
+            sns.kdeplot(data=data.frame, x='normalized_compound', label='Sentiment Scores', ax=ax)
+        else:
+            ax.plot(KDE_GRID, data.review_density, label='Review Scores')
+            ax.plot(KDE_GRID, data.sentiment_density, label='Sentiment Scores')
+            ax.set_ylabel('Density')
+        ax.set_xlabel('Normalized Score')
+        ax.legend()
+
+    def _draw_correlation(self, ax, data: ComparisonData):
+        if data.frame is not None:
+            sns.regplot(data=data.frame, x='score', y='normalized_compound', ax=ax)
+        else:
+            edges = np.linspace(0, 1, HIST_BINS + 1)
+            if data.hist.any():
+                ax.pcolormesh(edges, edges, data.hist.T, cmap='Blues', norm=LogNorm())
+            if data.sample is not None:
+                ax.scatter(*data.sample, s=4, alpha=0.4, color='tab:orange')
+            if data.fit is not None:
+                ax.plot([0, 1], np.polyval(data.fit, [0, 1]), color='tab:red')
+        ax.set_title(f'Score Correlation (r={data.correlation})')
+        ax.set_xlabel('Review Score')
+        ax.set_ylabel('Sentiment Score')
     
     def _base_plot(self, config: PlotConfig, show: bool = True):
         """Base plotting method with common functionality"""
-        config.plot_func(**config.subplot_args if config.subplot_args else {})
-        
-        if self.output_dir:
-            plt.savefig(self.output_dir / config.filename)
+        with metrics.stage('plot') as record:
+            config.plot_func(**config.subplot_args if config.subplot_args else {})
+            
+            if self.output_dir:
+                plt.savefig(self.output_dir / config.filename)
+            record['plots'] = 1
         if show:
             plt.show()
         else:
@@ -53,32 +164,18 @@ class SentimentPlotter:
     
     def plot_score_comparison(self, results: Dict, movie_name: str, show: bool = True):
         """Plot the comparison between review scores and sentiment scores"""
-        def plot_comparison(df, comparison):
+        def plot_comparison(data):
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
-            
-            sns.kdeplot(data=df, x='score', label='Review Scores', ax=ax1)
-            sns.kdeplot(data=df, x='normalized_compound', label='Sentiment Scores', ax=ax1)
+            self._draw_distribution(ax1, data)
             ax1.set_title('Score Distribution Comparison')
-            ax1.set_xlabel('Normalized Score')
-            ax1.legend()
-            
-            sns.regplot(data=df, x='score', y='normalized_compound', ax=ax2)
-            ax2.set_title(f'Score Correlation (r={comparison["correlation"]})')
-            ax2.set_xlabel('Review Score')
-            ax2.set_ylabel('Sentiment Score')
-            
-        comparison = results['comparison']
-        df = pd.DataFrame({
-            'score': comparison['review_scores'],
-            'normalized_compound': comparison['sentiment_scores']
-        })
-        
+            self._draw_correlation(ax2, data)
+
         config = PlotConfig(
             title='Score Comparison',
             figsize=(15, 5),
             filename=f'{movie_name}_score_comparison.png',
             plot_func=plot_comparison,
-            subplot_args={'df': df, 'comparison': comparison}
+            subplot_args={'data': self._comparison_data(results['comparison'])}
         )
         self._base_plot(config, show)
     
@@ -110,22 +207,12 @@ class SentimentPlotter:
             ax1.set_title(f'Sentiment Distribution - {model_type}')
             
             ax2 = fig.add_subplot(gs[0, 1])
-            comparison = results['comparison']
-            df = pd.DataFrame({
-                'score': comparison['review_scores'],
-                'normalized_compound': comparison['sentiment_scores']
-            })
-            sns.kdeplot(data=df, x='score', label='Review Scores', ax=ax2)
-            sns.kdeplot(data=df, x='normalized_compound', label='Sentiment Scores', ax=ax2)
+            data = self._comparison_data(results['comparison'])
+            self._draw_distribution(ax2, data)
             ax2.set_title('Score Distribution')
-            ax2.set_xlabel('Normalized Score')
-            ax2.legend()
             
             ax3 = fig.add_subplot(gs[1, 0])
-            sns.regplot(data=df, x='score', y='normalized_compound', ax=ax3)
-            ax3.set_title(f'Score Correlation (r={comparison["correlation"]})')
-            ax3.set_xlabel('Review Score')
-            ax3.set_ylabel('Sentiment Score')
+            self._draw_correlation(ax3, data)
             
             ax4 = fig.add_subplot(gs[1, 1])
             scores = results['average_scores']
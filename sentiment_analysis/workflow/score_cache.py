@@ -0,0 +1,108 @@
+# workflow/score_cache.py
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+SCORE_COLUMNS = ('neg', 'neu', 'pos', 'compound')
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_QUERY_BATCH = 900
+
+class ScoreCache:
+    """SQLite-backed sentiment score cache keyed by (model, artifact hash, text hash)"""
+
+    def __init__(self, path: str = 'out/cache/scores.sqlite', max_entries: int = 5_000_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                model TEXT NOT NULL,
+                artifact TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                neg REAL, neu REAL, pos REAL, compound REAL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, artifact, text_hash)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_scores_last_used ON scores (last_used)')
+        self.conn.commit()
+        self._entries = self.conn.execute('SELECT COUNT(*) FROM scores').fetchone()[0]
+
+    @staticmethod
+    def hash_text(text: str) -> bytes:
+        """Content hash of a review text"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def get_many(self, model: str, artifact: str, hashes: Sequence[bytes]) -> Dict[bytes, Tuple]:
+        """Look up cached scores in bulk and mark the hits as recently used"""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), _QUERY_BATCH):
+            batch = unique[i:i + _QUERY_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f'SELECT text_hash, {", ".join(SCORE_COLUMNS)} FROM scores '
+                f'WHERE model = ? AND artifact = ? AND text_hash IN ({placeholders})',
+                (model, artifact, *batch)
+            ).fetchall()
+            for row in rows:
+                found[row[0]] = row[1:]
+
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                'UPDATE scores SET last_used = ? WHERE model = ? AND artifact = ? AND text_hash = ?',
+                [(now, model, artifact, text_hash) for text_hash in found]
+            )
+            self.conn.commit()
+        return found
+
+    def put_many(self, model: str, artifact: str, hashes: Sequence[bytes], sentiments: Dict[str, np.ndarray]):
+        """Store freshly computed scores and evict the least recently used entries over the cap"""
+        now = time.time()
+        columns = [sentiments[c].tolist() if c in sentiments else [None] * len(hashes)
+                   for c in SCORE_COLUMNS]
+        rows = [(model, artifact, text_hash, *values, now)
+                for text_hash, *values in zip(hashes, *columns)]
+        cursor = self.conn.executemany(
+            'INSERT OR IGNORE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows
+        )
+        self._entries += cursor.rowcount
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        """Drop the least recently used entries until the cache is within max_entries"""
+        excess = self._entries - self.max_entries
+        if excess <= 0:
+            return
+        self.conn.execute("""
+            DELETE FROM scores WHERE (model, artifact, text_hash) IN (
+                SELECT model, artifact, text_hash FROM scores ORDER BY last_used LIMIT ?
+            )
+        """, (excess,))
+        self._entries -= excess
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for the current run"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': self._entries}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,96 +1,334 @@
 # workflow/sentiment_analyzer.py
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import os
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
+from .. import metrics
 from ..models import get_model
+from ..models.base import SentimentModel
+from ..storage import backend_for_path
+from .feature_store import feature_path, load_features, save_features
+from .score_cache import ScoreCache, SCORE_COLUMNS
+
+AVERAGE_KEYS = {
+    'positive': 'pos',
+    'negative': 'neg',
+    'neutral': 'neu',
+    'compound': 'compound'
+}
+
+# Histogram bin edges for compound scores and normalized review scores
+COMPOUND_EDGES = np.linspace(-1.0, 1.0, 21)
+SCORE_EDGES = np.linspace(0.0, 1.0, 11)
+
+_worker_model: SentimentModel = None
+
+def _init_worker(model_name: str, model_options: Dict):
+    """Load one model instance per worker process"""
+    global _worker_model
+    _worker_model = get_model(model_name, **model_options)
+
+def _score_batch(texts: List[str]) -> Dict[str, np.ndarray]:
+    """Score a batch of texts with the worker's model"""
+    return _worker_model.analyze_batch(texts)
+
+def compare_scores(scores: np.ndarray, normalized: np.ndarray) -> Dict[str, float]:
+    """
+    Pearson correlation (over pairs without NaN, like pandas), MAE and RMSE
+    between review scores and normalized compound scores
+    """
+    error = scores - normalized
+    valid = ~(np.isnan(scores) | np.isnan(normalized))
+    correlation = float('nan')
+    if valid.sum() > 1:
+        x = scores[valid] - scores[valid].mean()
+        y = normalized[valid] - normalized[valid].mean()
+        denominator = np.sqrt(np.dot(x, x) * np.dot(y, y))
+        if denominator > 0:
+            correlation = float(np.dot(x, y) / denominator)
+    return {
+        'correlation': round(correlation, 3),
+        'mae': round(float(np.abs(error).sum()) / len(error), 3),
+        'rmse': round((float(np.dot(error, error)) / len(error)) ** 0.5, 3)
+    }
+
+@dataclass
+class RunningTotals:
+    """Running sums from which all aggregate metrics can be derived"""
+    total: int = 0
+    sums: Dict[str, float] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+    score_sum: float = 0.0
+    score_sq_sum: float = 0.0
+    sentiment_sum: float = 0.0
+    sentiment_sq_sum: float = 0.0
+    cross_sum: float = 0.0
+    abs_error_sum: float = 0.0
+    sq_error_sum: float = 0.0
+    compound_hist: np.ndarray = field(default_factory=lambda: np.zeros(len(COMPOUND_EDGES) - 1, dtype=np.int64))
+    score_hist: np.ndarray = field(default_factory=lambda: np.zeros(len(SCORE_EDGES) - 1, dtype=np.int64))
+
+    def update(self, scores: np.ndarray, sentiments: Dict[str, np.ndarray],
+               normalized: np.ndarray, counts: Dict[str, int]):
+        """Fold one chunk of scored reviews into the running sums"""
+        self.total += len(scores)
+        for key, values in sentiments.items():
+            self.sums[key] = self.sums.get(key, 0.0) + float(values.sum())
+        for label, count in counts.items():
+            self.counts[label] = self.counts.get(label, 0) + count
+
+        error = scores - normalized
+        self.score_sum += float(scores.sum())
+        self.score_sq_sum += float(np.dot(scores, scores))
+        self.sentiment_sum += float(normalized.sum())
+        self.sentiment_sq_sum += float(np.dot(normalized, normalized))
+        self.cross_sum += float(np.dot(scores, normalized))
+        self.abs_error_sum += float(np.abs(error).sum())
+        self.sq_error_sum += float(np.dot(error, error))
+        if 'compound' in sentiments:
+            self.compound_hist += np.histogram(np.clip(sentiments['compound'], -1.0, 1.0), COMPOUND_EDGES)[0]
+        self.score_hist += np.histogram(np.clip(scores, 0.0, 1.0), SCORE_EDGES)[0]
+
+    def correlation(self) -> float:
+        """Pearson correlation between review and sentiment scores"""
+        n = self.total
+        cov = n * self.cross_sum - self.score_sum * self.sentiment_sum
+        var_scores = n * self.score_sq_sum - self.score_sum ** 2
+        var_sentiments = n * self.sentiment_sq_sum - self.sentiment_sum ** 2
+        if var_scores <= 0 or var_sentiments <= 0:
+            return float('nan')
+        return cov / (var_scores * var_sentiments) ** 0.5
 
 class SentimentAnalyzer:
-    def __init__(self, model_name: str = 'vader'):
-        """Initialize with either 'vader' or 'logreg' model"""
-        self.model = get_model(model_name)
+    def __init__(self, model_name: str = 'vader', batch_size: int = 10000, workers: int = 1,
+                 cache: Optional[ScoreCache] = None, features: bool = False,
+                 model_dir: Optional[str] = None):
+        """
+        Initialize with either 'vader' or 'logreg' model. With features, models
+        that vectorize their input (logreg) score whole files from TF-IDF
+        matrices stored next to them, building a matrix on first use.
+        model_dir loads the logreg model from another directory than assets/models.
+        """
+        self.model_options = {'model_dir': model_dir} if model_dir else {}
+        self.model = get_model(model_name, **self.model_options)
         self.model_type = model_name
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.cache = cache
+        self.features = features and hasattr(self.model, 'analyze_matrix')
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @contextmanager
+    def _scoring_pool(self):
+        """Keep a single process pool alive for the duration of a run"""
+        if self.workers == 1 or self._executor is not None:
+            yield
+            return
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             initializer=_init_worker,
+                                             initargs=(self.model_type, self.model_options))
+        try:
+            yield
+        finally:
+            self._executor.shutdown()
+            self._executor = None
+
+    def score_reviews(self, reviews: List[str]) -> Dict[str, np.ndarray]:
+        """Score reviews, serving what we can from the cache, and return one array per sentiment key"""
+        if self.cache is None:
+            return self._score_uncached(reviews)
+
+        artifact = self.model.artifact_hash()
+        hashes = [ScoreCache.hash_text(review) for review in reviews]
+        cached = self.cache.get_many(self.model_type, artifact, hashes)
+
+        missing = {}
+        for text_hash, review in zip(hashes, reviews):
+            if text_hash not in cached:
+                missing.setdefault(text_hash, review)
+        fresh = self._score_uncached(list(missing.values()))
+        if missing:
+            self.cache.put_many(self.model_type, artifact, list(missing.keys()), fresh)
+
+        # Stack cached rows and fresh rows into one table per key and gather each review's row
+        position = {text_hash: i for i, text_hash in enumerate(cached)}
+        position.update((text_hash, len(cached) + i) for i, text_hash in enumerate(missing))
+        rows = np.fromiter((position[text_hash] for text_hash in hashes), dtype=np.intp, count=len(hashes))
+        columns = {key: SCORE_COLUMNS.index(key) for key in self.model.score_keys}
+        cached_table = np.array(list(cached.values()), dtype=np.float64).reshape(len(cached), len(SCORE_COLUMNS))
+        sentiments = {
+            key: np.take(np.concatenate([cached_table[:, column], fresh[key]]), rows)
+            for key, column in columns.items()
+        }
+
+        hits = int(np.count_nonzero(rows < len(cached)))
+        self.cache.hits += hits
+        self.cache.misses += len(reviews) - hits
+        return sentiments
+
+    def _score_uncached(self, reviews: List[str]) -> Dict[str, np.ndarray]:
+        """Score reviews in batches and return one array per sentiment key"""
+        if self.workers > 1 and len(reviews) > 1:
+            with self._scoring_pool():
+                batches = self._score_parallel(reviews)
+        else:
+            batches = [self.model.analyze_batch(reviews[i:i + self.batch_size])
+                       for i in range(0, len(reviews), self.batch_size)]
+        return {
+            key: (np.concatenate([batch[key] for batch in batches])
+                  if batches else np.empty(0, dtype=np.float64))
+            for key in self.model.score_keys
+        }
+
+    def _score_parallel(self, reviews: List[str]) -> List[Dict[str, np.ndarray]]:
+        """Shard reviews across the process pool, keeping the original order"""
+        # A few batches per worker keeps the pool busy without paying IPC per review
+        batch_size = max(1, min(self.batch_size, -(-len(reviews) // (self.workers * 4))))
+        chunks = [reviews[i:i + batch_size] for i in range(0, len(reviews), batch_size)]
+        return list(self._executor.map(_score_batch, chunks))
 
     def analyze_reviews(self, csv_path: str) -> Dict:
-        """Analyze all reviews in a CSV file and return aggregate metrics"""
-        df = pd.read_csv(csv_path)
-        reviews = df['review'].tolist()
-        scores = df['score'].tolist()
-        
-        sentiments = [self.model.analyze(review) for review in reviews]
-        compounds = [s['compound'] for s in sentiments]
-        normalized_compounds = [(c + 1) / 2 for c in compounds]
-
-        comparison = {
-            'review_scores': scores,
-            'sentiment_scores': normalized_compounds,
-            'correlation': round(pd.Series(scores).corr(pd.Series(normalized_compounds)), 3),
-            'mae': round(sum(abs(s - c) for s, c in zip(scores, normalized_compounds)) / len(scores), 3),
-            'rmse': round((sum((s - c) ** 2 for s, c in zip(scores, normalized_compounds)) / len(scores)) ** 0.5, 3)
+        """Analyze all reviews in a CSV or Parquet file and return aggregate metrics"""
+        with metrics.stage('analyze.read') as record:
+            df = backend_for_path(csv_path).read(csv_path, columns=['review', 'score'])
+            scores = df['score'].to_numpy(dtype=np.float64)
+            record['rows'] = len(df)
+        with metrics.stage('analyze.score') as record:
+            if self.features:
+                sentiments = self._score_features(csv_path, df['review'].tolist(), record)
+            else:
+                cache_before = self._cache_counts()
+                sentiments = self.score_reviews(df['review'].tolist())
+                record.update(**self._cache_metrics(cache_before))
+            record['rows'] = len(df)
+        with metrics.stage('analyze.aggregate') as record:
+            record['rows'] = len(df)
+            return self.results_from_scores(scores, sentiments)
+
+    def _score_features(self, csv_path: str, reviews: List[str], record: Dict) -> Dict[str, np.ndarray]:
+        """Score a file from its stored TF-IDF matrix, vectorizing and storing it if it is missing or stale"""
+        path = feature_path(csv_path, self.model.vectorizer_hash())
+        matrix = load_features(path, csv_path)
+        if matrix is None or matrix.shape[0] != len(reviews):
+            matrix = self.model.transform(reviews)
+            save_features(path, matrix, csv_path)
+            record['features'] = 'built'
+        else:
+            record['features'] = 'loaded'
+        return self.model.analyze_matrix(matrix)
+
+    def _cache_counts(self) -> Tuple[int, int]:
+        return (self.cache.hits, self.cache.misses) if self.cache is not None else (0, 0)
+
+    def _cache_metrics(self, before: Tuple[int, int]) -> Dict:
+        """Score cache hits and misses since before, for the metrics recorder"""
+        if self.cache is None:
+            return {}
+        hits, misses = self._cache_counts()
+        return {'score_cache': {'hits': hits - before[0], 'misses': misses - before[1]}}
+
+    def results_from_scores(self, scores: np.ndarray, sentiments: Dict[str, np.ndarray]) -> Dict:
+        """Aggregate metrics of scored reviews, including the per-review scores for plotting"""
+        normalized = (sentiments['compound'] + 1) / 2
+
+        results = self._build_results(
+            len(scores),
+            {key: float(values.sum()) for key, values in sentiments.items()},
+            self._count_labels(sentiments['compound'])
+        )
+        results['comparison'] = {
+            'review_scores': scores.tolist(),
+            'sentiment_scores': normalized.tolist(),
+            **compare_scores(scores, normalized)
         }
+        return results
+
+    def analyze_reviews_streaming(self, csv_path: str, chunk_size: int = 50000,
+                                  scores_path: Optional[str] = None) -> Dict:
+        """
+        Analyze a CSV or Parquet file chunk by chunk in bounded memory.
+        Per-review scores are not kept in the results; pass scores_path to
+        write them to a CSV file as each chunk is scored.
+        """
+        return self.totals_to_results(self.accumulate(csv_path, chunk_size, scores_path))
+
+    def accumulate(self, csv_path: str, chunk_size: int = 50000,
+                   scores_path: Optional[str] = None) -> RunningTotals:
+        """Score a file chunk by chunk into running totals"""
+        totals = RunningTotals()
+        if scores_path:
+            os.makedirs(os.path.dirname(scores_path) or '.', exist_ok=True)
 
-        results = (self._aggregate_vader_sentiments(sentiments) 
-                  if self.model_type == 'vader' 
-                  else self._aggregate_logreg_sentiments(sentiments))
-        
-        results['comparison'] = comparison
+        with metrics.stage('analyze.stream') as record, self._scoring_pool():
+            cache_before = self._cache_counts()
+            reader = backend_for_path(csv_path).iter_chunks(csv_path, ['review', 'score'], chunk_size)
+            for chunk_index, chunk in enumerate(reader):
+                scores = chunk['score'].to_numpy(dtype=np.float64)
+                sentiments = self.score_reviews(chunk['review'].tolist())
+                normalized = self.add_to_totals(totals, scores, sentiments)
+
+                if scores_path:
+                    out = pd.DataFrame({'score': scores, **sentiments, 'normalized_compound': normalized})
+                    out.to_csv(scores_path, mode='w' if chunk_index == 0 else 'a',
+                               header=chunk_index == 0, index=False)
+            record.update(rows=totals.total, **self._cache_metrics(cache_before))
+        return totals
+
+    def add_to_totals(self, totals: RunningTotals, scores: np.ndarray,
+                      sentiments: Dict[str, np.ndarray]) -> np.ndarray:
+        """Fold scored reviews into running totals and return their normalized compound scores"""
+        normalized = (sentiments['compound'] + 1) / 2
+        totals.update(scores, sentiments, normalized, self._count_labels(sentiments['compound']))
+        return normalized
+
+    def accumulate_many(self, paths: Dict[str, str], chunk_size: int = 50000) -> Iterator[Tuple[str, RunningTotals]]:
+        """Score several files into running totals, one per name, sharing one process pool"""
+        with self._scoring_pool():
+            for name, path in paths.items():
+                yield name, self.accumulate(path, chunk_size)
+
+    def totals_to_results(self, totals: RunningTotals) -> Dict:
+        """Build the streaming results schema from running totals"""
+        results = self._build_results(totals.total, totals.sums, totals.counts)
+        results['comparison'] = {
+            'correlation': round(totals.correlation(), 3),
+            'mae': round(totals.abs_error_sum / totals.total, 3),
+            'rmse': round((totals.sq_error_sum / totals.total) ** 0.5, 3)
+        }
         return results
 
-    def _aggregate_vader_sentiments(self, sentiments: List[Dict]) -> Dict:
-        """Aggregate VADER sentiment scores with original thresholds"""
-        total = len(sentiments)
-        
-        avg_pos = sum(s['pos'] for s in sentiments) / total
-        avg_neg = sum(s['neg'] for s in sentiments) / total
-        avg_neu = sum(s['neu'] for s in sentiments) / total
-        avg_compound = sum(s['compound'] for s in sentiments) / total
-        
-        positive_count = sum(1 for s in sentiments if s['compound'] >= 0.05)
-        negative_count = sum(1 for s in sentiments if s['compound'] <= -0.05)
-        neutral_count = total - positive_count - negative_count
-        
-        return {
-            'total_reviews': total,
-            'average_scores': {
-                'positive': round(avg_pos, 3),
-                'negative': round(avg_neg, 3),
-                'neutral': round(avg_neu, 3),
-                'compound': round(avg_compound, 3)
-            },
-            'sentiment_distribution': {
+    def _count_labels(self, compounds: np.ndarray) -> Dict[str, int]:
+        """Count positive/negative(/neutral) reviews using the model's thresholds"""
+        total = len(compounds)
+        if self.model_type == 'vader':
+            positive_count = int((compounds >= 0.05).sum())
+            negative_count = int((compounds <= -0.05).sum())
+            return {
                 'positive': positive_count,
                 'negative': negative_count,
-                'neutral': neutral_count
-            },
-            'sentiment_percentages': {
-                'positive': round((positive_count / total) * 100, 2),
-                'negative': round((negative_count / total) * 100, 2),
-                'neutral': round((neutral_count / total) * 100, 2)
+                'neutral': total - positive_count - negative_count
             }
+
+        positive_count = int((compounds > 0).sum())
+        return {
+            'positive': positive_count,
+            'negative': total - positive_count
         }
 
-    def _aggregate_logreg_sentiments(self, sentiments: List[Dict]) -> Dict:
-        """Aggregate Logistic Regression sentiment scores"""
-        total = len(sentiments)
-        
-        avg_pos = sum(s['pos'] for s in sentiments) / total
-        avg_neg = sum(s['neg'] for s in sentiments) / total
-        avg_compound = sum(s['compound'] for s in sentiments) / total
-        
-        positive_count = sum(1 for s in sentiments if s['compound'] > 0)
-        negative_count = total - positive_count
-        
+    def _build_results(self, total: int, sums: Dict[str, float], counts: Dict[str, int]) -> Dict:
+        """Build the results schema from score sums and label counts"""
         return {
             'total_reviews': total,
             'average_scores': {
-                'positive': round(avg_pos, 3),
-                'negative': round(avg_neg, 3),
-                'compound': round(avg_compound, 3)
-            },
-            'sentiment_distribution': {
-                'positive': positive_count,
-                'negative': negative_count
+                name: round(sums[key] / total, 3)
+                for name, key in AVERAGE_KEYS.items() if key in sums
             },
+            'sentiment_distribution': dict(counts),
             'sentiment_percentages': {
-                'positive': round((positive_count / total) * 100, 2),
-                'negative': round((negative_count / total) * 100, 2)
+                label: round((count / total) * 100, 2)
+                for label, count in counts.items()
             }
-        }
\ No newline at end of file
+        }
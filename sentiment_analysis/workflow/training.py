@@ -0,0 +1,244 @@
+# workflow/training.py
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from .. import metrics
+from ..storage import backend_for_path
+
+# LogRegModel loads these names, so a model directory written here can be used as is
+MODEL_FILE = 'sentiment_model.joblib'
+VECTORIZER_FILE = 'tfidf_vectorizer.joblib'
+REPORT_FILE = 'training.json'
+
+CLASSES = np.array([0, 1])
+
+def label_reviews(scores: np.ndarray, positive_from: float, negative_to: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Binary labels from normalized review scores: 1 at or above positive_from,
+    0 at or below negative_to. Returns the mask of labeled rows and their labels.
+    """
+    labeled = (scores >= positive_from) | (scores <= negative_to)
+    return labeled, (scores[labeled] >= positive_from).astype(np.int64)
+
+def in_holdout(texts: Sequence[str], fraction: float) -> np.ndarray:
+    """
+    Holdout membership by text hash, so a review lands on the same side in
+    every chunk, epoch and warm-started run
+    """
+    limit = int(fraction * 2 ** 64)
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little') < limit
+         for text in texts),
+        dtype=bool, count=len(texts)
+    )
+
+@dataclass
+class HoldoutMetrics:
+    """Confusion counts and summed log loss over the holdout rows"""
+    tp: int = 0
+    fp: int = 0
+    tn: int = 0
+    fn: int = 0
+    log_loss_sum: float = 0.0
+
+    def update(self, labels: np.ndarray, pos: np.ndarray):
+        predicted = pos >= 0.5
+        actual = labels == 1
+        self.tp += int(np.sum(predicted & actual))
+        self.fp += int(np.sum(predicted & ~actual))
+        self.tn += int(np.sum(~predicted & ~actual))
+        self.fn += int(np.sum(~predicted & actual))
+        p = np.clip(np.where(actual, pos, 1 - pos), 1e-15, 1.0)
+        self.log_loss_sum -= float(np.log(p).sum())
+
+    @property
+    def rows(self) -> int:
+        return self.tp + self.fp + self.tn + self.fn
+
+    def to_dict(self) -> Dict:
+        if self.rows == 0:
+            return {'rows': 0}
+        precision = self.tp / (self.tp + self.fp) if self.tp + self.fp else 0.0
+        recall = self.tp / (self.tp + self.fn) if self.tp + self.fn else 0.0
+        return {
+            'rows': self.rows,
+            'positive_share': round((self.tp + self.fn) / self.rows, 4),
+            'accuracy': round((self.tp + self.tn) / self.rows, 4),
+            'precision': round(precision, 4),
+            'recall': round(recall, 4),
+            'f1': round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+            'log_loss': round(self.log_loss_sum / self.rows, 4),
+            'confusion': {'tp': self.tp, 'fp': self.fp, 'tn': self.tn, 'fn': self.fn}
+        }
+
+@dataclass
+class TrainingReport:
+    """Row counts, timings and holdout metrics of one training run"""
+    files: List[str] = field(default_factory=list)
+    warm_start: bool = False
+    epochs: int = 0
+    train_rows: int = 0
+    unlabeled_rows: int = 0
+    vectorize_s: float = 0.0
+    fit_s: float = 0.0
+    elapsed_s: float = 0.0
+    holdout: Dict = field(default_factory=dict)
+
+    @property
+    def rows_per_s(self) -> float:
+        busy = self.vectorize_s + self.fit_s
+        return self.train_rows / busy if busy else 0.0
+
+    def summary(self) -> str:
+        holdout = self.holdout
+        quality = (f"holdout accuracy {holdout['accuracy']:.3f}, F1 {holdout['f1']:.3f}, "
+                   f"log loss {holdout['log_loss']:.3f} on {holdout['rows']} reviews"
+                   if holdout.get('rows') else 'no holdout reviews')
+        return (f"Trained on {self.train_rows} reviews from {len(self.files)} files in {self.elapsed_s:.2f}s "
+                f"({self.rows_per_s:,.0f} reviews/s; vectorize {self.vectorize_s:.2f}s, fit {self.fit_s:.2f}s); "
+                f"{quality}")
+
+class LogRegTrainer:
+    """
+    Out-of-core training of the logreg model: cleaned review files are read
+    in chunks, hashed into features by a stateless HashingVectorizer and fed
+    to a logistic-loss SGDClassifier with partial_fit, so memory is bounded
+    by the chunk size and the feature count rather than the corpus.
+    """
+
+    def __init__(self, n_features: int = 2 ** 20, alpha: float = 1e-5, chunk_size: int = 50000,
+                 positive_from: float = 0.6, negative_to: float = 0.4, holdout: float = 0.1, seed: int = 0):
+        if not negative_to < positive_from:
+            raise ValueError("negative_to must be below positive_from")
+        self.n_features = n_features
+        self.alpha = alpha
+        self.chunk_size = chunk_size
+        self.positive_from = positive_from
+        self.negative_to = negative_to
+        self.holdout = holdout
+        self.rng = np.random.default_rng(seed)
+        self.seed = seed
+        self.vectorizer = None
+        self.classifier = None
+        self.report = TrainingReport()
+
+    def start_new(self):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+
+        # The same word uni- and bigrams as the notebook's TfidfVectorizer, without a vocabulary to fit
+        self.vectorizer = HashingVectorizer(ngram_range=(1, 2), n_features=self.n_features,
+                                            alternate_sign=False, norm='l2')
+        self.classifier = SGDClassifier(loss='log_loss', alpha=self.alpha, random_state=self.seed)
+
+    def warm_start(self, model_dir: str):
+        """Continue from a model directory written by an earlier run"""
+        import joblib
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+
+        vectorizer = joblib.load(os.path.join(model_dir, VECTORIZER_FILE))
+        classifier = joblib.load(os.path.join(model_dir, MODEL_FILE))
+        if not isinstance(vectorizer, HashingVectorizer) or not isinstance(classifier, SGDClassifier):
+            raise TypeError(f"The model in '{model_dir}' was not trained by senti train and cannot be warm-started")
+        self.vectorizer = vectorizer
+        self.classifier = classifier
+        self.n_features = vectorizer.n_features
+        self.report.warm_start = True
+
+    def _labeled_chunks(self, paths: Sequence[str]) -> Iterator[Tuple[List[str], np.ndarray, np.ndarray, int]]:
+        """Texts, labels and holdout mask of the labeled rows and the count of unlabeled rows, chunk by chunk"""
+        for path in paths:
+            for chunk in backend_for_path(path).iter_chunks(path, ['review', 'score'], self.chunk_size):
+                chunk = chunk.dropna()
+                scores = chunk['score'].to_numpy(dtype=np.float64)
+                labeled, labels = label_reviews(scores, self.positive_from, self.negative_to)
+                texts = chunk['review'].astype(str).to_numpy()[labeled].tolist()
+                yield texts, labels, in_holdout(texts, self.holdout), len(chunk) - len(texts)
+
+    def fit(self, paths: Sequence[str], epochs: int = 1):
+        """Train on every non-holdout review of the files, shuffled within each chunk"""
+        if self.classifier is None:
+            self.start_new()
+        self.report.files = list(paths)
+        with metrics.stage('train') as record:
+            for epoch in range(epochs):
+                for texts, labels, holdout, unlabeled in self._labeled_chunks(paths):
+                    if epoch == 0:
+                        self.report.unlabeled_rows += unlabeled
+                    train = np.flatnonzero(~holdout)
+                    if len(train) == 0:
+                        continue
+                    train = self.rng.permutation(train)
+
+                    started = time.perf_counter()
+                    matrix = self.vectorizer.transform([texts[i] for i in train])
+                    self.report.vectorize_s += time.perf_counter() - started
+                    started = time.perf_counter()
+                    self.classifier.partial_fit(matrix, labels[train], classes=CLASSES)
+                    self.report.fit_s += time.perf_counter() - started
+                    self.report.train_rows += len(train)
+                self.report.epochs += 1
+            record.update(rows=self.report.train_rows, vectorize_s=self.report.vectorize_s,
+                          fit_s=self.report.fit_s)
+        if self.report.train_rows == 0:
+            raise ValueError("No labeled training reviews found")
+
+    def evaluate(self, paths: Sequence[str]) -> Dict:
+        """Holdout metrics of the current model, read in a second pass over the files"""
+        holdout_metrics = HoldoutMetrics()
+        with metrics.stage('train.evaluate') as record:
+            for texts, labels, holdout, _ in self._labeled_chunks(paths):
+                rows = np.flatnonzero(holdout)
+                if len(rows) == 0:
+                    continue
+                matrix = self.vectorizer.transform([texts[i] for i in rows])
+                holdout_metrics.update(labels[rows], self.classifier.predict_proba(matrix)[:, 1])
+            record['rows'] = holdout_metrics.rows
+        self.report.holdout = holdout_metrics.to_dict()
+        return self.report.holdout
+
+    def save(self, model_dir: str):
+        """Write the model, vectorizer and training report; each file is replaced atomically"""
+        import joblib
+
+        os.makedirs(model_dir, exist_ok=True)
+        for name, obj in ((MODEL_FILE, self.classifier), (VECTORIZER_FILE, self.vectorizer)):
+            path = os.path.join(model_dir, name)
+            joblib.dump(obj, f'{path}.tmp')
+            os.replace(f'{path}.tmp', path)
+
+        report = {
+            'trained': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            **{key: round(value, 4) if isinstance(value, float) else value
+               for key, value in asdict(self.report).items()},
+            'rows_per_s': round(self.report.rows_per_s, 1),
+            'params': {'n_features': self.n_features, 'alpha': self.classifier.alpha,
+                       'positive_from': self.positive_from, 'negative_to': self.negative_to,
+                       'holdout': self.holdout, 'chunk_size': self.chunk_size}
+        }
+        with open(os.path.join(model_dir, REPORT_FILE), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+def train_logreg(paths: Sequence[str], model_dir: str = 'out/models/logreg', warm_start: bool = False,
+                 epochs: int = 1, **options) -> TrainingReport:
+    """
+    Train the logreg model on cleaned review files, evaluate it on the
+    holdout reviews and write artifacts LogRegModel loads from model_dir
+    """
+    started = time.perf_counter()
+    trainer = LogRegTrainer(**options)
+    if warm_start:
+        trainer.warm_start(model_dir)
+    trainer.fit(paths, epochs)
+    trainer.evaluate(paths)
+    trainer.report.elapsed_s = time.perf_counter() - started
+    trainer.save(model_dir)
+    return trainer.report